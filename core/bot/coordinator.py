@@ -0,0 +1,155 @@
+import time
+import multiprocessing
+from core.log import log
+from core.ocr.ocr_service import OcrService, RemoteOcr
+from core.simulator import SimulatorController
+from utils.frame_ring import FrameRing
+from .newspaper_bot import NewspaperBot
+from .page_pipeline import PagePipeline
+from .scheduler import Scheduler
+
+
+def run_worker(workerId, port, bot_args, ring_handle, requests, responses, results, stop_event, pipeline=False):
+    """
+    工作进程入口：连接一个模拟器并运行一个 NewspaperBot，识别请求交给协调进程的 OcrService，
+    结束时把统计信息放入 results
+    :param bot_args: (商品编号, 商品名称, 全部商品名称)
+    """
+    ring = FrameRing.attach(*ring_handle)
+    ocr = RemoteOcr(workerId, ring, requests, responses)
+    simulator = SimulatorController(port)
+    stats = {"serial": simulator.serial, "connected": False}
+    bot = page_pipeline = None
+    try:
+        if not simulator.connect():
+            return
+        stats["connected"] = True
+        simulator.templates.load_all()
+
+        key, label, product_labels = bot_args
+        bot = NewspaperBot(simulator, ocr, key, label, product_labels, name=simulator.serial)
+        if pipeline:
+            page_pipeline = PagePipeline(bot, ocr_workers=ocr.size).start()
+            bot.page_source = page_pipeline.next_page
+        Scheduler(stop_event.is_set).add(bot.machine).run()
+    except Exception as e:
+        log.error(f"[{simulator.serial}] 工作进程出错: {e}")
+    finally:
+        if page_pipeline is not None:
+            page_pipeline.stop()
+        if bot is not None:
+            stats.update(
+                bot=bot.stats(),
+                adb=simulator.adb.latency_report(),
+                frames=simulator.frames.stats(),
+                page_detector=bot.page_detector.stats(),
+            )
+            if page_pipeline is not None:
+                stats["pipeline"] = page_pipeline.stats()
+        results.put((workerId, stats))
+        ocr.close()
+        ring.close()
+
+
+class ProcessCoordinator:
+    """
+    多进程模式：每个模拟器一个工作进程，避免一个进程内多个设备的 NumPy/PIL 处理争抢 GIL。
+    协调进程持有共用的 OCR 引擎（OcrService），每个工作进程有一块 FrameRing 共享内存用于传递待识别的图片；
+    模板匹配在各工作进程中进行（模板从磁盘缓存加载）。
+    协调进程负责转发停止信号、回收进程和共享内存，并汇总各进程的统计信息。
+    """
+
+    def __init__(self, ports, ocr, bot_args, pipeline=False, slots=2, slot_size=4 * 1024 * 1024):
+        """
+        :param ports: 模拟器 adb 端口列表
+        :param ocr: 协调进程中共用的 OCR 对象（OcrCache / OcrPool）
+        :param bot_args: (商品编号, 商品名称, 全部商品名称)，传给每个工作进程的 NewspaperBot
+        :param pipeline: 工作进程是否使用 PagePipeline
+        :param slots: 每个工作进程的共享内存槽位数量，即同时在途的识别请求数量
+        :param slot_size: 每个槽位的字节数
+        """
+        self.ports = list(dict.fromkeys(ports))
+        self.ocr = ocr
+        self.bot_args = bot_args
+        self.pipeline = pipeline
+        self.slots = slots
+        self.slot_size = slot_size
+        # Windows 只支持 spawn，统一使用 spawn 保证各平台行为一致
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._results = self._context.Queue()
+        self._requests = self._context.Queue()
+        self._rings = {}
+        self._responses = {}
+        self._processes = {}
+        self.service = None
+        self.worker_stats = {}
+
+    def start(self):
+        for workerId, port in enumerate(self.ports):
+            self._rings[workerId] = FrameRing(self.slots, self.slot_size)
+            self._responses[workerId] = self._context.Queue()
+        self.service = OcrService(self.ocr, self._requests, self._responses, self._rings).start()
+
+        for workerId, port in enumerate(self.ports):
+            process = self._context.Process(
+                target=run_worker, name=f"worker-{port}", daemon=True,
+                args=(workerId, port, self.bot_args, self._rings[workerId].handle, self._requests,
+                      self._responses[workerId], self._results, self._stop_event, self.pipeline),
+            )
+            process.start()
+            self._processes[workerId] = process
+        log.info(f"已启动 {len(self._processes)} 个工作进程，端口：{self.ports}")
+        return self
+
+    def run(self, should_stop=None, poll_interval=0.2):
+        """
+        等待全部工作进程结束，should_stop 返回 True 时通知所有工作进程停止
+        :return: 收到停止信号返回 False，全部工作进程正常结束返回 True
+        """
+        should_stop = should_stop or (lambda: False)
+        stopped = False
+        while any(process.is_alive() for process in self._processes.values()):
+            self._collect()
+            if not stopped and should_stop():
+                log.info("收到停止信号,通知所有工作进程退出")
+                self._stop_event.set()
+                stopped = True
+            time.sleep(poll_interval)
+        self._collect()
+        return not stopped
+
+    def stop(self, timeout=10):
+        """通知工作进程停止并回收进程、OCR 服务和共享内存"""
+        self._stop_event.set()
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                log.info(f"工作进程 {process.name} 未在 {timeout}s 内退出，强制结束")
+                process.terminate()
+                process.join()
+        self._collect()
+        if self.service is not None:
+            self.service.stop()
+        for ring in self._rings.values():
+            ring.close()
+        self._rings = {}
+
+    def _collect(self):
+        while not self._results.empty():
+            workerId, stats = self._results.get()
+            self.worker_stats[workerId] = stats
+
+    def stats(self):
+        """
+        :return: {"workers": {序列号: 工作进程统计}, "refresh_counter": 全部设备刷新次数之和,
+                  "found": 找到目标的设备, "ocr_service": OcrService.stats()}
+        """
+        workers = {stats["serial"]: stats for stats in self.worker_stats.values()}
+        bots = {serial: stats["bot"] for serial, stats in workers.items() if "bot" in stats}
+        return {
+            "workers": workers,
+            "refresh_counter": sum(bot["refresh_counter"] for bot in bots.values()),
+            "found": [serial for serial, bot in bots.items() if bot["found"]],
+            "ocr_service": self.service.stats() if self.service is not None else {},
+        }
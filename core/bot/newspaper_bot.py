@@ -0,0 +1,234 @@
+import cv2
+from collections import deque
+from core.log import log
+from core.ocr.ocr_result import OcrResult
+from utils.ocr_analysis import OcrAnalysis
+from utils.page_detector import PageChangeDetector
+from utils.text_index import TextIndex
+from .state_machine import StateMachine
+
+
+class NewspaperBot:
+    """
+    刷报纸买东西的流程，拆成以下状态：
+        scan_page   识别当前报纸页，决定要进哪些小店
+        visit_shop  打开下一个小店（前 5 页只进出售目标商品的小店，之后逐个进入页面上的所有小店）
+        scan_shop   在小店中查找并点击目标商品，有更多商品时向后滑动
+        return      返回报纸
+        swipe       报纸翻页
+    流程状态（当前计数、刷新次数、已记录的页面）都保存在实例中，一个模拟器对应一个实例，日志以实例名称开头。
+    """
+
+    SCAN_PAGE = "scan_page"
+    VISIT_SHOP = "visit_shop"
+    SCAN_SHOP = "scan_shop"
+    RETURN = "return"
+    SWIPE = "swipe"
+
+    # 小店中表示还有更多商品的箭头
+    MORE_TARGETS = ["./res/image/more1.png", "./res/image/more2.png"]
+    # 小店左上角的返回按钮，出现表示小店界面已打开
+    RETURN_TARGET = "./res/image/return.png"
+
+    def __init__(self, simulator, ocr, key, label, product_labels=None, name="bot", page_source=None):
+        """
+        :param simulator: SimulatorController
+        :param ocr: OCR 对象（需要 runBytes）
+        :param key: 目标商品的编号，对应 ./res/image/{key}.png
+        :param label: 目标商品名称
+        :param product_labels: 全部商品名称，模糊匹配时识别文本只归给其中最相似的一个
+        :param name: 名称，用于日志和统计，多开时使用设备序列号
+        :param page_source: 无参数的函数，返回当前报纸页的 (缩略图, 识别结果)，如 PagePipeline.next_page；
+                            为 None 时在当前线程中依次截图、识别
+        """
+        self.name = name
+        self.simulator = simulator
+        self.ocr = ocr
+        self.target = f"./res/image/{key}.png"
+        self.label = label
+        self.product_labels = product_labels or [label]
+        self.page_source = page_source
+
+        self.counter = 1
+        self.refresh_counter = 0
+        self.found = False
+        # 报纸每页左页格子区域的缩略图，用于判断翻页和刷新
+        self.page_detector = PageChangeDetector(simulator.ocr_profile.rows, simulator.ocr_profile.cols[:2])
+        # 报纸每页左页文本组成的签名 -> 页码，缩略图匹配不上时（如画面有动画）再按识别结果判断
+        self.page_signatures = {}
+
+        self._shops = deque()  # 待进入的小店位置
+        self._first_pass = True  # 前 5 页：只进出售目标商品的小店
+        self._current_page = None
+        self._swipe_back = False
+
+        self.machine = StateMachine(name)
+        self.machine.add(self.SCAN_PAGE, self.scan_page)
+        self.machine.add(self.VISIT_SHOP, self.visit_shop)
+        self.machine.add(self.SCAN_SHOP, self.scan_shop)
+        self.machine.add(self.RETURN, self.return_to_newspaper)
+        self.machine.add(self.SWIPE, self.swipe)
+        self.machine.start(self.SCAN_PAGE)
+
+    def ocr_newspaper(self, frame=None):
+        """只识别报纸格子区域，识别框坐标换算回屏幕坐标"""
+        return self.recognize(*self.simulator.take_newspaper_mosaic(frame))
+
+    def recognize(self, mosaic, mosaic_map):
+        """
+        识别报纸格子拼图（take_newspaper_mosaic 的返回值），识别框坐标换算回屏幕坐标。
+        截图失败时返回错误码 900，与没有识别到文本（101）区分
+        """
+        if mosaic is None:
+            return OcrResult(900, message="截图失败")
+        return OcrResult.from_dict(self.ocr.runBytes(mosaic)).remap(mosaic_map)
+
+    def newspaper_thumbnail(self, frame=None):
+        """
+        报纸左页格子区域的缩略图，截图失败返回 None
+        :param frame: 已截取的帧，为 None 时获取最新一帧
+        """
+        if frame is None:
+            gray = self.simulator.capture_gray_frame()
+        else:
+            gray = self.simulator.frames.convert(frame, cv2.COLOR_RGBA2GRAY)
+        return self.page_detector.thumbnail(gray) if gray is not None else None
+
+    def match_page(self, thumbnail):
+        """
+        判断缩略图属于已记录的第几页，不属于任何一页（已刷新）时返回 None。
+        缩略图为 None（截图失败）时无法判断，调用方需要单独处理，不能当作已刷新
+        """
+        return self.page_detector.match(thumbnail) if thumbnail is not None else None
+
+    def scan_page(self):
+        log.debug(f"[{self.name}] 当前计数: {self.counter}")
+        if self.page_source is not None:
+            thumbnail, ocr_res = self.page_source()
+        else:
+            thumbnail = self.newspaper_thumbnail()
+            ocr_res = self.ocr_newspaper()
+        return self.handle_page(thumbnail, ocr_res)
+
+    def handle_page(self, thumbnail, ocr_res):
+        """根据当前页的缩略图和识别结果决定下一步"""
+        # 截图失败或识别出错时无法判断页面内容和是否已刷新，重新识别当前页，不能当作没有目标直接翻页
+        if thumbnail is None or ocr_res.code not in (100, 101):
+            log.debug(f"[{self.name}] 截图或识别失败（{ocr_res.code}），重新识别当前页")
+            return self.SCAN_PAGE
+
+        layout = OcrAnalysis.get_page_layout(ocr_res)
+
+        if self.counter <= 5:
+            # 记录左页缩略图和签名
+            self.page_detector.remember(self.counter, thumbnail)
+            if layout.signature:
+                self.page_signatures[layout.signature] = self.counter
+            log.info(f"[{self.name}] 当前所在 {self.counter} 页,内容为：{layout.all_texts}")
+
+            # 前 5 页只进出售目标商品的小店
+            locations = TextIndex(ocr_res).find(self.label, self.product_labels)
+            if not locations:
+                self._swipe_back = False
+                return self.SWIPE
+            self._first_pass = True
+            self._shops = deque(locations)
+            return self.VISIT_SHOP
+
+        # 根据缩略图判断当前页属于哪一页，匹配不上时再比较页面签名
+        current_page = self.match_page(thumbnail)
+        if current_page is None:
+            current_page = self.page_signatures.get(layout.signature)
+            # 按签名认出的页面更新缩略图，之后 visit_shop 按缩略图判断刷新时才会得出相同的结论
+            if current_page is not None:
+                self.page_detector.remember(current_page, thumbnail)
+
+        if current_page is not None:
+            log.info(f"[{self.name}] 当前页属于第 {current_page} 页,内容为：{layout.left_texts}")
+        else:
+            log.info(f"[{self.name}] 页面已刷新,将再次查找")
+            self._count_refresh()
+            self.page_detector.reset()
+            self.page_detector.remember(self.counter, thumbnail)
+            self.page_signatures = {layout.signature: self.counter} if layout.signature else {}
+
+        # 之后逐个进入页面上的所有小店
+        self._first_pass = False
+        self._current_page = current_page
+        self._shops = deque(block.center for block in ocr_res)
+        return self.VISIT_SHOP
+
+    def visit_shop(self):
+        if not self._shops:
+            return self._after_shops()
+
+        # 逐个进入时，每次都通过缩略图判断页面是否已刷新，不需要重新 OCR；截图失败时跳过这次判断
+        thumbnail = None if self._first_pass else self.newspaper_thumbnail()
+        if thumbnail is not None and self.match_page(thumbnail) is None:
+            log.info(f"[{self.name}] 页面已刷新，停止当前循环并重置")
+            self._count_refresh()
+            self.page_detector.reset()
+            self.page_signatures = {}
+            self.counter = 0
+            self._shops.clear()
+            return self._after_shops()
+
+        center_x, center_y = self._shops.popleft()
+        self.simulator.click(center_x, center_y)
+        if not self.simulator.wait_for_element(self.RETURN_TARGET, timeout=3):
+            log.debug(f"[{self.name}] 等待小店界面打开超时")
+        return self.SCAN_SHOP
+
+    def scan_shop(self):
+        for _ in range(3):
+            if self.simulator.click_element(self.target, enable_scaling=self._first_pass):
+                self.found = True
+                return None
+
+            if self.simulator.find_any(self.MORE_TARGETS):
+                self.simulator.swipe(1670.0, 450.0, 150.0, 450.0, 800)
+                self.simulator.wait_for_stable(timeout=2)
+            else:
+                break
+
+        log.info(f"[{self.name}] 未在小店中找到想要购买的 {self.label},将重新返回报纸进行刷新")
+        return self.RETURN
+
+    def return_to_newspaper(self):
+        """点击返回按钮，等到报纸画面重新稳定"""
+        self.simulator.click_element(self.RETURN_TARGET)
+        self.simulator.wait_for_element_gone(self.RETURN_TARGET, timeout=3)
+        self.simulator.wait_for_stable(timeout=2)
+        return self.VISIT_SHOP
+
+    def swipe(self):
+        if self._swipe_back:
+            self.simulator.swipe(200.0, 1030.0, 1670.0, 1030.0, 800)
+        else:
+            self.simulator.swipe(1670.0, 1030.0, 870.0, 1030.0)
+        self.simulator.wait_for_stable(timeout=2)
+        self.counter += 1
+        return self.SCAN_PAGE
+
+    def _after_shops(self):
+        """当前页的小店都进过了"""
+        if self._first_pass:
+            log.info(f"[{self.name}] 遍历完所有位置都未找到目标，继续刷新报纸")
+            self._count_refresh()
+            return None
+
+        if self.counter < 1:
+            self.simulator.wait_for_stable(timeout=2)
+        elif self._current_page is not None and self._current_page >= 2:
+            self._swipe_back = True
+            return self.SWIPE
+        self.counter += 1
+        return self.SCAN_PAGE
+
+    def _count_refresh(self):
+        self.refresh_counter += 1
+        log.info(f"[{self.name}] 报纸已刷新 {self.refresh_counter} 次")
+
+    def stats(self):
+        """:return: 流程统计（刷新次数、各状态耗时）"""
+        return dict(self.machine.stats(), refresh_counter=self.refresh_counter, found=self.found)
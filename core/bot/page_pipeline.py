@@ -0,0 +1,229 @@
+import time
+import queue
+import threading
+from core.log import log
+
+
+class PageJob:
+    """流水线中的一帧报纸画面：截图时的输入 epoch 以及各阶段的产物"""
+
+    __slots__ = ("epoch", "captured_at", "frame", "thumbnail", "mosaic", "mosaic_map", "ocr_res")
+
+    def __init__(self, epoch, frame):
+        self.epoch = epoch
+        self.captured_at = time.monotonic()
+        self.frame = frame
+        self.thumbnail = None
+        self.mosaic = None
+        self.mosaic_map = None
+        self.ocr_res = None
+
+
+class _Stage:
+    """流水线的一个阶段：从输入队列取帧、处理后放入输出队列，记录处理耗时、丢弃次数和输入队列深度"""
+
+    def __init__(self, name, func, inbox, outbox, workers=1):
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._processed = 0
+        self._dropped = 0
+        self._total = 0.0
+        self._peak = 0.0
+        self._max_depth = 0
+
+    def record(self, elapsed):
+        with self._lock:
+            self._processed += 1
+            self._total += elapsed
+            self._peak = max(self._peak, elapsed)
+
+    def drop(self):
+        with self._lock:
+            self._dropped += 1
+
+    def sample_depth(self, depth):
+        with self._lock:
+            self._max_depth = max(self._max_depth, depth)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "processed": self._processed,
+                "dropped": self._dropped,
+                "avg_ms": round(self._total * 1000 / self._processed, 1) if self._processed else 0.0,
+                "max_ms": round(self._peak * 1000, 1),
+                "depth": self.inbox.qsize() if self.inbox is not None else 0,
+                "max_depth": self._max_depth,
+            }
+
+
+class PagePipeline:
+    """
+    报纸页识别流水线：截图 -> 预处理（缩略图、格子拼图）-> OCR -> 决策，各阶段在独立线程中运行，
+    阶段之间用有界队列连接，上一帧在 OCR 时下一帧已经在截图和预处理。
+    每一帧记录截图时的输入 epoch，点击/滑动之后（FrameProvider.invalidate）之前截取的帧在任何阶段都会被直接丢弃。
+    只在决策线程等待报纸页（next_page）时截图，其余时间不占用 adb 和 OCR 引擎。
+    """
+
+    def __init__(self, bot, queue_size=1, ocr_workers=1, poll_interval=0.05, max_age_ms=2000, timeout=10.0):
+        """
+        :param bot: NewspaperBot，预处理和识别沿用它的缩略图与 recognize 实现
+        :param queue_size: 阶段之间每个队列的容量
+        :param ocr_workers: OCR 阶段的线程数，不超过 OCR 引擎数量才有意义
+        :param poll_interval: 各阶段等待输入和停止信号的间隔（秒）
+        :param max_age_ms: 交给决策时允许的最大帧龄（毫秒），报纸可能在没有输入时自行刷新，缓冲过久的帧同样丢弃
+        :param timeout: next_page 最长等待时间（秒），超时后退回顺序截图识别
+        """
+        self.bot = bot
+        self.frames = bot.simulator.frames
+        self.poll_interval = poll_interval
+        self.max_age_ms = max_age_ms
+        self.timeout = timeout
+
+        self._wanted = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._last_frame = None
+        self._age_lock = threading.Lock()
+        self._ages = [0, 0.0]  # [交付次数, 总帧龄]
+
+        captured = queue.Queue(queue_size)
+        prepared = queue.Queue(queue_size)
+        self._pages = queue.Queue(queue_size)
+        self.stages = [
+            _Stage("capture", self._capture, None, captured),
+            _Stage("preprocess", self._preprocess, captured, prepared),
+            _Stage("ocr", self._recognize, prepared, self._pages, ocr_workers),
+        ]
+        # 决策阶段在调用 next_page 的线程（状态机）中执行，只用于统计
+        self._decide = _Stage("decide", None, self._pages, None)
+
+    def start(self):
+        for stage in self.stages:
+            for index in range(stage.workers):
+                thread = threading.Thread(target=self._run_stage, args=(stage,), daemon=True,
+                                          name=f"pipeline-{stage.name}-{index}")
+                thread.start()
+                self._threads.append(thread)
+        log.info(f"报纸识别流水线已启动，共 {len(self._threads)} 个线程")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def next_page(self):
+        """
+        取一页最新的报纸识别结果，作为 NewspaperBot 的 page_source 代替顺序截图、识别
+        :return: (缩略图, OcrResult)
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        self._wanted.set()
+        try:
+            while time.monotonic() < deadline and not self._stop.is_set():
+                try:
+                    job = self._pages.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    continue
+                self._decide.sample_depth(self._pages.qsize() + 1)
+                age = time.monotonic() - job.captured_at
+                if self._stale(job) or age * 1000 > self.max_age_ms:
+                    self._decide.drop()
+                    continue
+                self._decide.record(time.perf_counter() - start)
+                with self._age_lock:
+                    self._ages[0] += 1
+                    self._ages[1] += age
+                return job.thumbnail, job.ocr_res
+        finally:
+            self._wanted.clear()
+
+        log.debug("流水线等待超时，改为顺序截图识别")
+        return self.bot.newspaper_thumbnail(), self.bot.ocr_newspaper()
+
+    def _run_stage(self, stage):
+        while not self._stop.is_set():
+            if stage.inbox is None:
+                # 截图阶段：没有人等待报纸页时不截图
+                if not self._wanted.wait(self.poll_interval):
+                    continue
+                job = None
+            else:
+                try:
+                    job = stage.inbox.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    continue
+                stage.sample_depth(stage.inbox.qsize() + 1)
+                if self._stale(job):
+                    stage.drop()
+                    continue
+
+            start = time.perf_counter()
+            try:
+                job = stage.func(job)
+            except Exception as e:
+                log.debug(f"流水线阶段 {stage.name} 处理失败: {e}")
+                job = None
+            if job is None:
+                continue
+            stage.record(time.perf_counter() - start)
+            self._put(stage, job)
+
+    def _put(self, stage, job):
+        """放入下一阶段的队列，队列满时等待，等待期间帧过期则丢弃"""
+        while not self._stop.is_set():
+            if self._stale(job):
+                stage.drop()
+                return
+            try:
+                stage.outbox.put(job, timeout=self.poll_interval)
+                return
+            except queue.Full:
+                continue
+
+    def _stale(self, job):
+        """截图之后发生过输入"""
+        return job.epoch != self.frames.epoch
+
+    def _capture(self, _):
+        # 先读 epoch 再截图：截图过程中发生输入时，这一帧会被当作过期帧丢弃
+        epoch = self.frames.epoch
+        frame = self.bot.simulator.capture_frame()
+        # 缓存命中时返回的是已经送入流水线的同一帧，等到下一次输入或缓存过期后再截
+        if frame is None or frame is self._last_frame:
+            deadline = time.monotonic() + self.poll_interval
+            while self.frames.epoch == epoch and time.monotonic() < deadline and not self._stop.is_set():
+                time.sleep(0.005)
+            return None
+        self._last_frame = frame
+        return PageJob(epoch, frame)
+
+    def _preprocess(self, job):
+        job.thumbnail = self.bot.newspaper_thumbnail(job.frame)
+        job.mosaic, job.mosaic_map = self.bot.simulator.take_newspaper_mosaic(job.frame)
+        job.frame = None
+        return job
+
+    def _recognize(self, job):
+        job.ocr_res = self.bot.recognize(job.mosaic, job.mosaic_map)
+        job.mosaic = None
+        return job
+
+    def stats(self):
+        """
+        :return: {阶段: {"processed", "dropped", "avg_ms", "max_ms", "depth", "max_depth"}}，
+                 depth 为阶段输入队列的当前深度；decide 的 avg_ms 为决策线程等待的时间，另有 avg_age_ms 为交付时的平均帧龄
+        """
+        stats = {stage.name: stage.stats() for stage in self.stages}
+        stats["decide"] = self._decide.stats()
+        with self._age_lock:
+            count, total = self._ages
+        stats["decide"]["avg_age_ms"] = round(total * 1000 / count, 1) if count else 0.0
+        return stats
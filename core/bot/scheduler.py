@@ -0,0 +1,79 @@
+import threading
+import traceback
+from core.log import log
+
+
+class Scheduler:
+    """
+    状态机调度器：在当前线程中轮流推进所有状态机，每次推进一步，
+    直到全部状态机结束或 should_stop 返回 True。
+    需要其他调度方式（如每个状态机一个线程）时继承并重写 run。
+    """
+
+    def __init__(self, should_stop=None):
+        """
+        :param should_stop: 无参数的函数，返回 True 时停止调度；每一步之前检查一次
+        """
+        self.should_stop = should_stop or (lambda: False)
+        self.machines = []
+
+    def add(self, machine):
+        self.machines.append(machine)
+        return self
+
+    def run(self):
+        """
+        运行到全部状态机结束或收到停止信号
+        :return: 收到停止信号返回 False，全部状态机正常结束返回 True
+        """
+        while True:
+            running = [machine for machine in self.machines if not machine.finished]
+            if not running:
+                return True
+            for machine in running:
+                if self.should_stop():
+                    log.info("收到停止信号,即将退出主循环")
+                    return False
+                machine.step()
+
+    def stats(self):
+        """:return: {状态机名称: StateMachine.stats()}"""
+        return {machine.name: machine.stats() for machine in self.machines}
+
+
+class ThreadedScheduler(Scheduler):
+    """
+    每个状态机一个线程，用于同时驱动多个模拟器：一个设备等待画面时不阻塞其他设备。
+    每个线程在每一步之前检查 should_stop；单个状态机出错时只结束该状态机，其他线程继续运行。
+    """
+
+    def run(self):
+        """
+        运行到全部状态机结束或收到停止信号
+        :return: 收到停止信号返回 False，全部状态机结束（包括出错结束）返回 True
+        """
+        stopped = threading.Event()
+        threads = [
+            threading.Thread(target=self._run_machine, args=(machine, stopped), name=machine.name, daemon=True)
+            for machine in self.machines
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if stopped.is_set():
+            log.info("收到停止信号,即将退出主循环")
+            return False
+        return True
+
+    def _run_machine(self, machine, stopped):
+        while not machine.finished:
+            if stopped.is_set() or self.should_stop():
+                stopped.set()
+                return
+            try:
+                machine.step()
+            except Exception as e:
+                log.error(f"[{machine.name}] 状态 {machine.state} 执行出错，该设备停止运行: {e}")
+                log.debug(traceback.format_exc())
+                machine.stop()
@@ -0,0 +1,93 @@
+import time
+import threading
+from core.log import log
+
+
+class StateMachine:
+    """
+    状态机：每个状态对应一个处理函数，处理函数执行该状态的动作并返回下一个状态，返回 None 表示结束。
+    记录每个状态的执行耗时和每种状态转移的次数，便于找出耗时最多的状态单独优化。
+    """
+
+    def __init__(self, name="bot"):
+        self.name = name
+        self.state = None
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._state_times = {}  # 状态 -> [次数, 总耗时, 最大耗时]
+        self._transitions = {}  # (状态, 下一状态) -> [次数, 总耗时]
+
+    def add(self, state, handler):
+        """
+        注册状态
+        :param state: 状态名
+        :param handler: 无参数的处理函数，返回下一个状态名，返回 None 表示结束
+        """
+        self._handlers[state] = handler
+        return self
+
+    def start(self, state):
+        """设置初始状态"""
+        if state not in self._handlers:
+            raise ValueError(f"未注册的状态：{state}")
+        self.state = state
+        return self
+
+    @property
+    def finished(self):
+        return self.state is None
+
+    def step(self):
+        """
+        执行当前状态一次并转移到下一个状态
+        :return: 下一个状态，结束时返回 None
+        """
+        state = self.state
+        if state is None:
+            return None
+
+        start = time.perf_counter()
+        next_state = self._handlers[state]()
+        elapsed = time.perf_counter() - start
+
+        if next_state is not None and next_state not in self._handlers:
+            raise ValueError(f"状态 {state} 返回了未注册的状态：{next_state}")
+        self._record(state, next_state, elapsed)
+        log.debug(f"[{self.name}] {state} -> {next_state}，耗时 {elapsed * 1000:.0f}ms")
+        self.state = next_state
+        return next_state
+
+    def stop(self):
+        """结束状态机，当前正在执行的状态执行完后不再继续"""
+        self.state = None
+
+    def _record(self, state, next_state, elapsed):
+        with self._lock:
+            times = self._state_times.setdefault(state, [0, 0.0, 0.0])
+            times[0] += 1
+            times[1] += elapsed
+            times[2] = max(times[2], elapsed)
+            transition = self._transitions.setdefault((state, next_state), [0, 0.0])
+            transition[0] += 1
+            transition[1] += elapsed
+
+    def stats(self):
+        """
+        :return: {"states": {状态: {"count", "avg_ms", "max_ms", "total_ms"}},
+                  "transitions": {"状态 -> 下一状态": {"count", "avg_ms"}}}
+        """
+        with self._lock:
+            states = {
+                state: {
+                    "count": count,
+                    "avg_ms": round(total * 1000 / count, 1),
+                    "max_ms": round(peak * 1000, 1),
+                    "total_ms": round(total * 1000, 1),
+                }
+                for state, (count, total, peak) in self._state_times.items()
+            }
+            transitions = {
+                f"{state} -> {next_state or 'end'}": {"count": count, "avg_ms": round(total * 1000 / count, 1)}
+                for (state, next_state), (count, total) in self._transitions.items()
+            }
+        return {"states": states, "transitions": transitions}
@@ -154,6 +154,10 @@ class ConsoleInput:
             print(f"【{self.config[menu_name]['title']}】选择已保存: {current_selection}")
         self.menu_stack = ["main"]
 
+    def product_labels(self):
+        """所有菜单中的商品名称（不带 action 的选项）"""
+        return [item['label'] for menu in self.config.values() for item in menu['options'] if 'action' not in item]
+
     def show_receipt(self):
         print("\n=== 购买明细 ===")
         total = 0
@@ -3,14 +3,21 @@
 # https://github.com/hiroi-sora/PaddleOCR-json
 
 import os
+import queue  # 连接池
 import socket  # 套接字
 import atexit  # 退出处理
+import threading  # 连接池计数、线程独立的接收缓冲区
 import subprocess  # 进程，管道
 import re  # regex
 from json import loads as jsonLoads, dumps as jsonDumps
 from sys import platform as sysPlatform  # popen静默模式
 from base64 import b64encode  # base64 编码
 
+try:  # 安装了 orjson 时用它解析识别结果，速度快数倍
+    from orjson import loads as jsonLoads
+except ImportError:
+    pass
+
 
 class PPOCR_pipe:  # 调用OCR（管道模式）
     def __init__(self, exePath: str, modelsPath: str = None, argument: dict = None):
@@ -177,12 +184,35 @@ class PPOCR_pipe:  # 调用OCR（管道模式）
 class PPOCR_socket(PPOCR_pipe):
     """调用OCR（套接字模式）"""
 
-    def __init__(self, exePath: str, modelsPath: str = None, argument: dict = None):
+    def __init__(
+            self,
+            exePath: str,
+            modelsPath: str = None,
+            argument: dict = None,
+            keepAlive: bool = False,
+            poolSize: int = 2,
+            timeout: float = 10,
+            probeTimeout: float = 1,
+    ):
         """初始化识别器（套接字模式）。\n
         `exePath`: 识别器`PaddleOCR_json.exe`的路径。\n
         `modelsPath`: 识别库`models`文件夹的路径。若为None则默认识别库与识别器在同一目录下。\n
-        `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json
+        `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json\n
+        `keepAlive`: 复用连接模式。指令与回复均以换行符分隔，连接用完放回连接池，不再每次重新建立TCP连接。\n
+        `poolSize`: 连接池大小，即允许同时进行识别的调用方数量。\n
+        `timeout`: 复用连接模式下等待回复的超时时间（秒）。\n
+        `probeTimeout`: 首次调用时握手判断服务器是否支持复用连接，等待空指令回复的时间（秒）。
         """
+        # 连接池（需在远程模式检测服务器可用性之前准备好）
+        self.__keepAlive = keepAlive
+        self.__keepAliveChecked = False
+        self.__probeLock = threading.Lock()
+        self.__timeout = timeout
+        self.__probeTimeout = probeTimeout
+        self.__idle = queue.LifoQueue()
+        self.__poolSlots = threading.BoundedSemaphore(max(1, poolSize))
+        self.__local = threading.local()
+
         # 处理参数
         if not argument:
             argument = {}
@@ -243,30 +273,40 @@ class PPOCR_socket(PPOCR_pipe):
 
         # 通信
         writeStr = jsonDumps(writeDict, ensure_ascii=True, indent=None) + "\n"
-        try:
-            # 创建TCP连接
-            clientSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            clientSocket.connect((self.ip, self.port))
-            # 发送数据
-            clientSocket.sendall(writeStr.encode())
-            # 发送完所有数据，关闭我方套接字，之后只能从服务器读取数据
-            clientSocket.shutdown(socket.SHUT_WR)
-            # 接收数据
-            resData = b""
-            while True:
-                chunk = clientSocket.recv(1024)
-                if not chunk:
-                    break
-                resData += chunk
-            getStr = resData.decode()
-        except ConnectionRefusedError:
-            return {"code": 902, "data": "连接被拒绝"}
-        except TimeoutError:
-            return {"code": 903, "data": "连接超时"}
-        except Exception as e:
-            return {"code": 904, "data": f"网络错误：{e}"}
-        finally:
-            clientSocket.close()  # 关闭连接
+        if self.__keepAlive:
+            try:
+                if not self.__keepAliveChecked:
+                    self.__probeKeepAlive()
+                getStr = self.__runKeepAlive(writeStr.encode()) if self.__keepAlive else None
+            except ConnectionRefusedError:
+                return {"code": 902, "data": "连接被拒绝"}
+            except TimeoutError:
+                return {"code": 903, "data": "连接超时"}
+            except Exception as e:
+                return {"code": 904, "data": f"网络错误：{e}"}
+            if getStr is None:  # 服务器不支持复用连接，退回单次连接模式
+                return self.runDict(writeDict)
+        else:
+            clientSocket = None
+            try:
+                # 创建TCP连接
+                clientSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                clientSocket.connect((self.ip, self.port))
+                # 发送数据
+                clientSocket.sendall(writeStr.encode())
+                # 发送完所有数据，关闭我方套接字，之后只能从服务器读取数据
+                clientSocket.shutdown(socket.SHUT_WR)
+                # 接收数据，直到服务器关闭连接
+                getStr, _ = self.__recvReply(clientSocket, False)
+            except ConnectionRefusedError:
+                return {"code": 902, "data": "连接被拒绝"}
+            except TimeoutError:
+                return {"code": 903, "data": "连接超时"}
+            except Exception as e:
+                return {"code": 904, "data": f"网络错误：{e}"}
+            finally:
+                if clientSocket:
+                    clientSocket.close()  # 关闭连接
         # 反序列输出信息
         try:
             return jsonLoads(getStr)
@@ -276,8 +316,104 @@ class PPOCR_socket(PPOCR_pipe):
                 "data": f"识别器输出值反序列化JSON失败。异常信息：[{e}]。原始内容：[{getStr}]",
             }
 
+    def __probeKeepAlive(self):
+        """握手判断服务器是否支持复用连接，只在首次调用时执行一次。\n
+        在新连接上发送空指令（不需要识别，服务器立即回复）：短时间内收到以换行符结尾的回复即支持复用；
+        服务器在收到EOF前不回复时，关闭我方写方向读完回复，切换为单次连接模式。\n
+        之后识别过程中的超时只作为超时处理，不再据此判断服务器是否支持复用连接。"""
+        with self.__probeLock:
+            if self.__keepAliveChecked:
+                return
+            conn = socket.create_connection((self.ip, self.port), timeout=self.__probeTimeout)
+            try:
+                conn.sendall(b"{}\n")
+                try:
+                    self.__recvReply(conn, True)
+                except TimeoutError:
+                    # 在等待时间内没有任何回复：确认服务器在收到EOF后才回复
+                    conn.settimeout(self.__timeout)
+                    conn.shutdown(socket.SHUT_WR)
+                    self.__recvReply(conn, False)
+                    print("###  套接字服务器不支持复用连接，已切换为单次连接模式。")
+                    self.__keepAlive = False
+            finally:
+                conn.close()
+            self.__keepAliveChecked = True
+
+    def __runKeepAlive(self, writeBytes: bytes):
+        """复用连接池中的连接发送指令，读取到换行符即视为回复结束。\n
+        服务器回复后主动关闭连接时，该连接不再放回连接池，下次自动重连。\n
+        等待回复超时时该连接直接关闭（迟到的回复无法与之后的指令对应），抛出 TimeoutError。\n
+        `return`: 回复字符串"""
+        for attempt in range(2):
+            conn, reused = self.__acquire()
+            reusable = False
+            try:
+                conn.sendall(writeBytes)
+                getStr, reusable = self.__recvReply(conn, True)
+            except (ConnectionResetError, BrokenPipeError):
+                if reused and attempt == 0:  # 空闲连接已被服务器关闭，换新连接重试
+                    continue
+                raise
+            finally:
+                self.__release(conn, reusable)
+            if getStr or not reused:
+                return getStr
+        raise ConnectionResetError("复用连接两次均被服务器关闭")
+
+    def __acquire(self):
+        """从连接池取出空闲连接，没有时新建。\n
+        `return`: (连接, 是否为复用的连接)"""
+        self.__poolSlots.acquire()
+        try:
+            return self.__idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        try:
+            conn = socket.create_connection((self.ip, self.port), timeout=self.__timeout)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return conn, False
+        except Exception:
+            self.__poolSlots.release()
+            raise
+
+    def __release(self, conn, reusable: bool):
+        """连接用完后放回连接池，不可复用的连接直接关闭"""
+        if reusable:
+            self.__idle.put(conn)
+        else:
+            conn.close()
+        self.__poolSlots.release()
+
+    def __recvReply(self, conn, untilNewline: bool):
+        """使用线程独立、预先分配的缓冲区（recv_into）接收回复，避免 bytes 反复拼接。\n
+        `untilNewline`: 为True时读到换行符即返回，否则读到对方关闭连接为止。\n
+        `return`: (回复字符串, 连接是否仍可复用)"""
+        buf = getattr(self.__local, "buffer", None)
+        if buf is None:
+            buf = self.__local.buffer = bytearray(1 << 20)
+        size = 0
+        while True:
+            if size == len(buf):
+                buf.extend(bytes(len(buf)))  # 缓冲区已满，容量翻倍
+            with memoryview(buf) as view:
+                n = conn.recv_into(view[size:])
+                if n == 0:  # 对方已关闭连接
+                    return str(view[:size], "utf-8", errors="ignore"), False
+                if untilNewline:
+                    end = buf.find(b"\n", size, size + n)
+                    if end >= 0:
+                        return str(view[:end], "utf-8", errors="ignore"), True
+            size += n
+
     def exit(self):
         """关闭引擎子进程"""
+        # 关闭连接池中的空闲连接
+        while True:
+            try:
+                self.__idle.get_nowait().close()
+            except (queue.Empty, AttributeError):
+                break
         # 仅在本地模式下关闭引擎进程
         if hasattr(self, "ret"):
             if self.__runningMode == "local":
@@ -319,16 +455,23 @@ class PPOCR_socket(PPOCR_pipe):
 
 
 def GetOcrApi(
-        exePath: str, modelsPath: str = None, argument: dict = None, ipcMode: str = "pipe"
+        exePath: str,
+        modelsPath: str = None,
+        argument: dict = None,
+        ipcMode: str = "pipe",
+        keepAlive: bool = False,
+        poolSize: int = 2,
 ):
     """获取识别器API对象。\n
     `exePath`: 识别器`PaddleOCR_json.exe`的路径。\n
     `modelsPath`: 识别库`models`文件夹的路径。若为None则默认识别库与识别器在同一目录下。\n
     `argument`: 启动参数，字典`{"键":值}`。参数说明见 https://github.com/hiroi-sora/PaddleOCR-json\n
-    `ipcMode`: 进程通信模式，可选值为套接字模式`socket` 或 管道模式`pipe`。用法上完全一致。
+    `ipcMode`: 进程通信模式，可选值为套接字模式`socket` 或 管道模式`pipe`。用法上完全一致。\n
+    `keepAlive`: 仅套接字模式，复用连接。\n
+    `poolSize`: 仅套接字模式，复用连接时的连接池大小。
     """
     if ipcMode == "socket":
-        return PPOCR_socket(exePath, modelsPath, argument)
+        return PPOCR_socket(exePath, modelsPath, argument, keepAlive, poolSize)
     elif ipcMode == "pipe":
         return PPOCR_pipe(exePath, modelsPath, argument)
     else:
@@ -0,0 +1,208 @@
+import os
+import re
+import asyncio
+import itertools
+from collections import deque
+from json import loads as jsonLoads, dumps as jsonDumps
+from base64 import b64encode
+from core.log import log
+
+try:  # 安装了 orjson 时用它解析识别结果
+    from orjson import loads as jsonLoads
+except ImportError:
+    pass
+
+
+class AsyncOcr:
+    """
+    OCR 引擎的 asyncio 客户端，支持管道和套接字两种模式。
+    识别请求不阻塞事件循环，截图、OCR 和输入可以在同一个事件循环中交错执行。
+    每个请求带有请求 ID，可设置超时，也可以被取消；被取消或超时的请求，其迟到的回复会被丢弃。
+    这是一个独立的客户端：主流程（NewspaperBot、PagePipeline）基于线程，使用同步的 OcrPool，不使用本类；
+    供基于 asyncio 的调用方使用。
+
+    用法：
+        ocr = await AsyncOcr.create(exePath)
+        res = await ocr.run_bytes(image_bytes, timeout=5)
+        await ocr.close()
+    """
+
+    # 引擎单行输出的上限（字节），识别结果多时一行 JSON 会远超 asyncio 默认的 64 KiB
+    STREAM_LIMIT = 64 * 1024 * 1024
+
+    def __init__(self, mode, process=None, address=None):
+        self.mode = mode
+        self.process = process
+        self.address = address
+        self._ids = itertools.count(1)
+        self._pending = deque()  # 管道模式下按发送顺序排队的 (请求 ID, future)
+        self._reader_task = None
+        self._reader_error = None  # 读取引擎输出结束后的错误回复，之后的请求直接返回
+
+    @classmethod
+    async def create(cls, exePath, modelsPath=None, argument=None, ipcMode="pipe"):
+        """
+        启动（或连接）OCR 引擎
+        :param exePath: 识别器路径；套接字模式下也可以是 remote://ip:port 形式的远程地址
+        :param modelsPath: 识别库 models 文件夹的路径
+        :param argument: 引擎启动参数
+        :param ipcMode: 通信模式，pipe 或 socket
+        :return: AsyncOcr
+        """
+        if ipcMode not in ("pipe", "socket"):
+            raise ValueError(f'ipcMode可选值为 套接字模式"socket" 或 管道模式"pipe" ，不允许{ipcMode}。')
+
+        match = re.search(r"remote://(.*):(\d+)", exePath)
+        if ipcMode == "socket" and match:
+            ip = {"any": "0.0.0.0", "loopback": "127.0.0.1"}.get(match.group(1), match.group(1))
+            return cls("socket", address=(ip, int(match.group(2))))
+
+        argument = dict(argument or {})
+        if ipcMode == "socket":
+            argument.setdefault("port", 0)  # 随机端口号
+            argument.setdefault("addr", "loopback")  # 本地环回地址
+        process = await asyncio.create_subprocess_exec(
+            *cls._build_command(exePath, modelsPath, argument),
+            cwd=os.path.dirname(os.path.abspath(exePath)),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=cls.STREAM_LIMIT,
+        )
+
+        # 等待引擎初始化完成
+        address = None
+        while True:
+            line = (await process.stdout.readline()).decode("utf-8", errors="ignore")
+            if not line:
+                raise Exception("OCR init fail.")
+            if ipcMode == "pipe" and "OCR init completed." in line:
+                break
+            if ipcMode == "socket" and "Socket init completed. " in line:
+                ip, port = line.split("Socket init completed. ")[1].strip().split(":")
+                address = (ip, int(port))
+                break
+
+        ocr = cls(ipcMode, process, address)
+        ocr._reader_task = asyncio.create_task(ocr._read_replies() if ipcMode == "pipe" else ocr._drain_stdout())
+        return ocr
+
+    @staticmethod
+    def _build_command(exePath, modelsPath, argument):
+        """与 PPOCR_pipe 相同的启动参数处理"""
+        cmds = [os.path.abspath(exePath)]
+        if modelsPath is not None:
+            if not os.path.isdir(modelsPath):
+                raise Exception(f"Input modelsPath doesn't exits or isn't a directory. modelsPath: [{modelsPath}]")
+            cmds += ["--models_path", os.path.abspath(modelsPath)]
+        for key, value in argument.items():
+            if isinstance(value, bool):
+                cmds += [f"--{key}={value}"]  # 布尔参数必须键和值连在一起
+            else:
+                cmds += [f"--{key}", str(value)]
+        return cmds
+
+    async def run_dict(self, writeDict, timeout=None):
+        """
+        发送指令字典并等待回复
+        :param writeDict: 指令字典
+        :param timeout: 超时时间（秒），超时返回错误码 903
+        :return: {"code": 识别码, "data": 内容列表或错误信息字符串}
+        """
+        request_id = next(self._ids)
+        writeBytes = (jsonDumps(writeDict, ensure_ascii=True, indent=None) + "\n").encode("utf-8")
+        request = self._request_pipe(request_id, writeBytes) if self.mode == "pipe" \
+            else self._request_socket(writeBytes)
+        try:
+            return await asyncio.wait_for(request, timeout)
+        except asyncio.TimeoutError:
+            log.debug(f"OCR 请求 {request_id} 超时")
+            return {"code": 903, "data": f"请求 {request_id} 超时"}
+
+    async def run(self, imgPath, timeout=None):
+        return await self.run_dict({"image_path": imgPath}, timeout)
+
+    async def run_base64(self, imageBase64, timeout=None):
+        return await self.run_dict({"image_base64": imageBase64}, timeout)
+
+    async def run_bytes(self, imageBytes, timeout=None):
+        return await self.run_base64(b64encode(imageBytes).decode("utf-8"), timeout)
+
+    async def _request_pipe(self, request_id, writeBytes):
+        if self.process.returncode is not None:
+            return {"code": 902, "data": "子进程已崩溃。"}
+        if self._reader_error is not None:
+            return self._reader_error
+        future = asyncio.get_running_loop().create_future()
+        # 入队和写入之间没有 await，保证回复顺序与队列顺序一致
+        self._pending.append((request_id, future))
+        self.process.stdin.write(writeBytes)
+        try:
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            return {"code": 902, "data": f"向识别器进程传入指令失败，疑似子进程已崩溃。{e}"}
+        # 取消时只取消这个 future，对应的回复到达后会被丢弃
+        return await future
+
+    async def _request_socket(self, writeBytes):
+        try:
+            reader, writer = await asyncio.open_connection(*self.address)
+        except ConnectionRefusedError:
+            return {"code": 902, "data": "连接被拒绝"}
+        try:
+            writer.write(writeBytes)
+            writer.write_eof()  # 发送完所有数据，之后只从服务器读取数据
+            await writer.drain()
+            getStr = (await reader.read()).decode("utf-8", errors="ignore")
+        except OSError as e:
+            return {"code": 904, "data": f"网络错误：{e}"}
+        finally:
+            writer.close()
+        return self._parse(getStr)
+
+    async def _read_replies(self):
+        """管道模式下持续读取引擎输出，按顺序交给等待中的请求"""
+        error = {"code": 902, "data": "子进程已崩溃。"}
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                if not self._pending:
+                    continue
+                request_id, future = self._pending.popleft()
+                if future.done():
+                    log.debug(f"丢弃已取消的 OCR 请求 {request_id} 的回复")
+                    continue
+                future.set_result(self._parse(line.decode("utf-8", errors="ignore")))
+        except Exception as e:
+            # 输出行超过上限等情况下回复顺序已无法对应，不再继续读取
+            log.debug(f"读取识别器进程输出失败: {e}")
+            error = {"code": 904, "data": f"读取识别器进程输出失败。异常信息：[{e}]"}
+        finally:
+            # 引擎已退出或输出无法继续解析，唤醒所有等待中的请求，之后的请求直接返回错误
+            self._reader_error = error
+            while self._pending:
+                _, future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(error)
+
+    async def _drain_stdout(self):
+        """套接字模式下持续读取并丢弃引擎的标准输出，防止缓冲区填满导致引擎阻塞"""
+        while await self.process.stdout.read(65536):
+            pass
+
+    @staticmethod
+    def _parse(getStr):
+        try:
+            return jsonLoads(getStr)
+        except Exception as e:
+            return {"code": 904, "data": f"识别器输出值反序列化JSON失败。异常信息：[{e}]。原始内容：[{getStr}]"}
+
+    async def close(self):
+        """关闭引擎子进程"""
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+        if self._reader_task is not None:
+            await self._reader_task
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class OcrCache:
+    """
+    OCR 结果缓存：按图片字节内容的哈希缓存识别结果，内容不变的图片直接返回上次的结果。
+    超过容量时按最近最少使用（LRU）淘汰。未缓存的方法直接转交给被包装的 OCR 对象。
+    """
+
+    # 只缓存识别成功（100）和未识别到文字（101）的结果，出错的结果下次重新识别
+    CACHEABLE_CODES = (100, 101)
+
+    def __init__(self, ocr, maxEntries=32):
+        """
+        :param ocr: OCR 对象（PPOCR_pipe / PPOCR_socket / OcrPool）
+        :param maxEntries: 最多缓存的结果数量
+        """
+        self.ocr = ocr
+        self.maxEntries = maxEntries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def runBytes(self, imageBytes):
+        """
+        对一张图片的字节流进行文字识别，相同内容的图片直接返回缓存结果
+        :param imageBytes: 图片字节流
+        :return: {"code": 识别码, "data": 内容列表或错误信息字符串}
+        """
+        key = self._key(imageBytes)
+        with self._lock:
+            res = self._entries.get(key)
+            if res is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return res
+            self.misses += 1
+
+        res = self.ocr.runBytes(imageBytes)
+        self._store(key, res)
+        return res
+
+    def run_many(self, images):
+        """
+        识别多张图片，先逐张查询缓存，未命中的图片交给 OCR 对象识别（支持 run_many 时并行识别）
+        :param images: 图片字节数据列表
+        :return: 与输入顺序一致的识别结果列表
+        """
+        if not hasattr(self.ocr, "run_many"):
+            return [self.runBytes(image) for image in images]
+
+        keys = [self._key(image) for image in images]
+        with self._lock:
+            results = [self._entries.get(key) for key in keys]
+            for key, res in zip(keys, results):
+                if res is not None:
+                    self._entries.move_to_end(key)
+            missing = [index for index, res in enumerate(results) if res is None]
+            self.hits += len(images) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            for index, res in zip(missing, self.ocr.run_many([images[index] for index in missing])):
+                results[index] = res
+                self._store(keys[index], res)
+        return results
+
+    @staticmethod
+    def _key(imageBytes):
+        return hashlib.blake2b(imageBytes, digest_size=16).digest()
+
+    def _store(self, key, res):
+        if res.get("code") not in self.CACHEABLE_CODES:
+            return
+        with self._lock:
+            self._entries[key] = res
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        :return: {"entries": 当前缓存数量, "hits": 命中次数, "misses": 未命中次数, "hit_rate": 命中率, "evictions": 淘汰次数}
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def __getattr__(self, name):
+        # 其余方法（runDict、exit 等）直接交给被包装的 OCR 对象
+        return getattr(self.ocr, name)
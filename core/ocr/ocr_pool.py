@@ -0,0 +1,120 @@
+import queue
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from core.log import log
+from core.ocr.PPOCR_api import GetOcrApi
+from core.ocr.ocr_transport import ImageTransport
+
+
+class OcrPool:
+    """
+    OCR 引擎进程池：启动多个引擎进程，请求交给当前空闲的引擎处理，引擎崩溃时自动重启。
+    与 PPOCR_pipe 的调用方式一致（runDict/run/runBase64/runBytes），另外提供 run_many 批量并行识别。
+    """
+
+    # 引擎实例不存在、子进程已崩溃或无法通信时返回的错误码
+    RESTART_CODES = (901, 902)
+
+    def __init__(self, exePath, size=2, modelsPath=None, argument=None, ipcMode="pipe", maxRestarts=5,
+                 transport=None):
+        """
+        :param exePath: 识别器 PaddleOCR-json.exe 的路径
+        :param size: 引擎进程数量
+        :param modelsPath: 识别库 models 文件夹的路径
+        :param argument: 引擎启动参数
+        :param ipcMode: 进程通信模式，pipe 或 socket
+        :param maxRestarts: 每个引擎允许自动重启的最大次数
+        :param transport: runBytes 使用的图片传输方式，为 None 时按图片大小自动选择（远程引擎只用 base64）
+        """
+        self._factory = lambda: GetOcrApi(exePath, modelsPath, dict(argument) if argument else None, ipcMode)
+        self.size = max(1, size)
+        self.maxRestarts = maxRestarts
+        self.transport = transport or (ImageTransport(None) if "remote://" in exePath else ImageTransport())
+        self._restarts = [0] * self.size
+        self._lock = threading.Lock()
+        self._idle = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="ocr-pool")
+
+        # 引擎初始化较慢，并行启动
+        self._workers = list(self._executor.map(lambda _: self._factory(), range(self.size)))
+        for index in range(self.size):
+            self._idle.put(index)
+        log.info(f"OCR 引擎进程池已启动，共 {self.size} 个引擎")
+
+    def runDict(self, writeDict: dict):
+        """
+        将指令交给一个空闲引擎执行，没有空闲引擎时等待
+        :param writeDict: 指令字典
+        :return: {"code": 识别码, "data": 内容列表或错误信息字符串}
+        """
+        index = self._idle.get()
+        try:
+            res = self._workers[index].runDict(writeDict)
+            if self._crashed(self._workers[index], res) and self._restart(index, res):
+                res = self._workers[index].runDict(writeDict)
+            return res
+        finally:
+            self._idle.put(index)
+
+    def run(self, imgPath: str):
+        return self.runDict({"image_path": imgPath})
+
+    def runBase64(self, imageBase64: str):
+        return self.runDict({"image_base64": imageBase64})
+
+    def runBytes(self, imageBytes):
+        return self.transport.run(self.runDict, imageBytes)
+
+    def run_many(self, images):
+        """
+        并行识别多张图片
+        :param images: 图片字节数据列表
+        :return: 与输入顺序一致的识别结果列表
+        """
+        return list(self._executor.map(self.runBytes, images))
+
+    def _crashed(self, worker, res):
+        """根据错误码和子进程状态判断引擎是否已崩溃（识别中途崩溃时错误码为读取/解析失败）"""
+        code = res.get("code")
+        if code in self.RESTART_CODES:
+            return True
+        process = getattr(worker, "ret", None)
+        if code in (903, 904) and process is not None:
+            try:
+                process.wait(timeout=1)
+                return True
+            except subprocess.TimeoutExpired:
+                return False
+        return False
+
+    def _restart(self, index, res):
+        """
+        重启崩溃的引擎
+        :return: 重启成功返回 True
+        """
+        if self._restarts[index] >= self.maxRestarts:
+            log.error(f"OCR 引擎 {index} 已重启 {self._restarts[index]} 次，不再重启：{res.get('data')}")
+            return False
+        log.warning(f"OCR 引擎 {index} 异常，正在重启：{res.get('data')}")
+        try:
+            self._workers[index].exit()
+        except Exception as e:
+            log.debug(f"关闭异常的 OCR 引擎失败：{e}")
+        try:
+            self._workers[index] = self._factory()
+        except Exception as e:
+            log.error(f"重启 OCR 引擎 {index} 失败：{e}")
+            return False
+        with self._lock:
+            self._restarts[index] += 1
+        return True
+
+    def exit(self):
+        """关闭所有引擎进程"""
+        self._executor.shutdown(wait=False)
+        for worker in self._workers:
+            try:
+                worker.exit()
+            except Exception as e:
+                log.debug(f"关闭 OCR 引擎失败：{e}")
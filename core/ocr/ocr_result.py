@@ -0,0 +1,101 @@
+import numpy as np
+from utils.image_utils import ImageUtils
+
+
+class OcrBlock:
+    """一条识别结果：文本、置信度、文本框及其中心点和边界"""
+
+    __slots__ = ("text", "score", "box", "center", "left", "top", "right", "bottom")
+
+    def __init__(self, text, score, box, center, bounds):
+        self.text = text
+        self.score = score
+        self.box = box
+        self.center = center
+        self.left, self.top, self.right, self.bottom = bounds
+
+    def __repr__(self):
+        return f"OcrBlock({self.text!r}, score={self.score:.3f}, center={self.center})"
+
+
+class OcrResult:
+    """
+    解析后的 OCR 识别结果。识别框、置信度、文本分别存为数组，
+    中心点和边界只在解析时计算一次，后续查找、排序都直接使用。
+        boxes:   (N, 4, 2) 的识别框顶点坐标
+        scores:  (N,) 的置信度
+        texts:   长度为 N 的文本列表
+        centers: (N, 2) 的中心点坐标（四个顶点的平均值）
+        mins / maxs: (N, 2) 的左上、右下边界
+    遍历时得到 OcrBlock 记录。
+    """
+
+    __slots__ = ("code", "message", "texts", "scores", "boxes", "centers", "mins", "maxs", "_blocks")
+
+    def __init__(self, code, texts=(), scores=None, boxes=None, message=None):
+        self.code = code
+        self.message = message
+        self.texts = list(texts)
+        count = len(self.texts)
+        self.scores = np.asarray(scores if scores is not None else np.ones(count), dtype=np.float64)
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(count, 4, 2) if boxes is not None \
+            else np.empty((0, 4, 2), dtype=np.int32)
+        self.centers = self.boxes.mean(axis=1)
+        self.mins = self.boxes.min(axis=1) if count else np.empty((0, 2), dtype=np.int32)
+        self.maxs = self.boxes.max(axis=1) if count else np.empty((0, 2), dtype=np.int32)
+        self._blocks = None
+
+    @classmethod
+    def from_dict(cls, res):
+        """
+        由引擎返回的字典构造
+        :param res: {"code": 识别码, "data": [{"box": ..., "score": ..., "text": ...}, ...] 或错误信息字符串}
+        :return: OcrResult
+        """
+        if isinstance(res, OcrResult):
+            return res
+        code, data = res.get("code"), res.get("data")
+        if code != 100 or not isinstance(data, list):
+            return cls(code, message=data)
+        return cls(code,
+                   texts=[item["text"] for item in data],
+                   scores=[item.get("score", 1.0) for item in data],
+                   boxes=[item["box"] for item in data])
+
+    def remap(self, mosaic_map):
+        """
+        将拼图中的识别框坐标换算回屏幕坐标
+        :param mosaic_map: ImageUtils.build_mosaic 返回的坐标映射
+        :return: 新的 OcrResult
+        """
+        if not len(self):
+            return self
+        return OcrResult(self.code, self.texts, self.scores, ImageUtils.map_mosaic_points(self.boxes, mosaic_map),
+                         self.message)
+
+    def to_dict(self):
+        """转回引擎返回的字典格式"""
+        if self.code != 100:
+            return {"code": self.code, "data": self.message}
+        return {"code": self.code, "data": [{"box": box, "score": float(score), "text": text}
+                                            for box, score, text in zip(self.boxes.tolist(), self.scores, self.texts)]}
+
+    @property
+    def blocks(self):
+        if self._blocks is None:
+            centers, bounds = self.centers.tolist(), np.hstack((self.mins, self.maxs)).tolist()
+            self._blocks = [OcrBlock(text, float(score), box, tuple(center), bound)
+                            for text, score, box, center, bound
+                            in zip(self.texts, self.scores, self.boxes, centers, bounds)]
+        return self._blocks
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        return iter(self.blocks)
+
+    def __repr__(self):
+        if self.code != 100:
+            return f"OcrResult(code={self.code}, message={self.message!r})"
+        return f"OcrResult(code={self.code}, texts={self.texts})"
@@ -0,0 +1,164 @@
+import time
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from core.log import log
+
+
+class OcrService:
+    """
+    协调进程中的集中 OCR 服务：所有工作进程共用一个 OCR 对象（OcrCache / OcrPool）。
+    工作进程通过共享的请求队列提交识别请求，图片字节放在各自的 FrameRing 中，只通过队列传递槽位编号；
+    识别结果放入对应工作进程的响应队列。
+
+    请求：(工作进程编号, 请求编号, 槽位编号, 字节数, 图片字节)，图片放不进槽位时槽位编号为 None、图片字节随请求传递
+    响应：(请求编号, 识别结果字典)
+    """
+
+    def __init__(self, ocr, requests, responses, rings):
+        """
+        :param ocr: OCR 对象（需要 runBytes，有 size 属性时按引擎数量并行识别）
+        :param requests: 共享的请求队列（multiprocessing.Queue）
+        :param responses: {工作进程编号: 响应队列}
+        :param rings: {工作进程编号: FrameRing}
+        """
+        self.ocr = ocr
+        self.requests = requests
+        self.responses = responses
+        self.rings = rings
+        self._executor = ThreadPoolExecutor(max_workers=getattr(ocr, "size", 1), thread_name_prefix="ocr-service")
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {}  # 传输方式 -> [次数, 总字节数, 总耗时]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, daemon=True, name="ocr-service")
+        self._thread.start()
+        log.info(f"OCR 服务已启动，服务 {len(self.rings)} 个工作进程")
+        return self
+
+    def stop(self):
+        """停止接收请求，等待正在识别的请求完成"""
+        if self._thread is not None:
+            self.requests.put(None)
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=True)
+
+    def _serve(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            self._executor.submit(self._handle, *request)
+
+    def _handle(self, workerId, requestId, slot, length, imageBytes):
+        start = time.perf_counter()
+        transport = "pickle"
+        try:
+            if slot is not None:
+                transport = "shared_memory"
+                imageBytes = self.rings[workerId].read(slot, length)
+            res = self.ocr.runBytes(imageBytes)
+        except Exception as e:
+            res = {"code": 904, "data": f"OCR 服务识别失败：{e}"}
+        self.responses[workerId].put((requestId, res))
+        self._record(transport, length, time.perf_counter() - start)
+
+    def _record(self, transport, size, elapsed):
+        with self._lock:
+            stats = self._stats.setdefault(transport, [0, 0, 0.0])
+            stats[0] += 1
+            stats[1] += size
+            stats[2] += elapsed
+
+    def stats(self):
+        """
+        :return: {传输方式: {"count": 次数, "avg_kb": 平均图片大小, "avg_ms": 平均耗时（含识别）}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": count,
+                    "avg_kb": round(size / count / 1024, 1),
+                    "avg_ms": round(elapsed * 1000 / count, 2),
+                }
+                for name, (count, size, elapsed) in self._stats.items()
+            }
+
+
+class RemoteOcr:
+    """
+    工作进程中的 OCR 代理，调用方式与 OcrPool 相同（runBytes），识别交给协调进程中的 OcrService。
+    图片写入本进程的 FrameRing 槽位，收到结果后归还槽位；可以在多个线程中同时调用。
+    """
+
+    def __init__(self, workerId, ring, requests, responses, timeout=30.0, slotWait=0.05):
+        """
+        :param workerId: 工作进程编号，与 OcrService 的 responses、rings 对应
+        :param ring: 本进程的 FrameRing
+        :param requests: 共享的请求队列
+        :param responses: 本进程的响应队列
+        :param timeout: 等待识别结果的最长时间（秒）
+        :param slotWait: 等待空闲槽位的最长时间（秒），超过后图片随请求传递
+        """
+        self.workerId = workerId
+        self.ring = ring
+        self.requests = requests
+        self.responses = responses
+        self.timeout = timeout
+        self.slotWait = slotWait
+        # 同时在途的请求数量受槽位数量限制，PagePipeline 按此设置 OCR 线程数
+        self.size = ring.slots
+        self._ids = itertools.count()
+        self._pending = {}
+        self._slots = {}  # 请求编号 -> 槽位编号，收到响应（包括超时后迟到的响应）时归还
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._dispatch, daemon=True, name="ocr-responses")
+        self._reader.start()
+
+    def runBytes(self, imageBytes):
+        """
+        :param imageBytes: 图片字节流
+        :return: {"code": 识别码, "data": 内容列表或错误信息字符串}
+        """
+        future = Future()
+        requestId = next(self._ids)
+        slot = self.ring.write(imageBytes, timeout=self.slotWait)
+        with self._lock:
+            self._pending[requestId] = future
+            if slot is not None:
+                self._slots[requestId] = slot
+
+        if slot is None:
+            log.debug(f"图片大小 {len(imageBytes)} 超过共享内存槽位或没有空闲槽位，改为随请求传递")
+            self.requests.put((self.workerId, requestId, None, len(imageBytes), bytes(imageBytes)))
+        else:
+            self.requests.put((self.workerId, requestId, slot, len(imageBytes), None))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except Exception:
+            return {"code": 903, "data": f"等待 OCR 服务响应超时（{self.timeout}s）"}
+        finally:
+            with self._lock:
+                self._pending.pop(requestId, None)
+
+    def _dispatch(self):
+        while True:
+            response = self.responses.get()
+            if response is None:
+                break
+            requestId, res = response
+            with self._lock:
+                future = self._pending.get(requestId)
+                slot = self._slots.pop(requestId, None)
+            # 服务端读取槽位后才会响应，收到响应即可归还槽位；超时后迟到的响应同样归还
+            if slot is not None:
+                self.ring.release(slot)
+            if future is not None:
+                future.set_result(res)
+
+    def close(self):
+        self.responses.put(None)
+        self._reader.join(timeout=5)
@@ -0,0 +1,93 @@
+import os
+import time
+import tempfile
+import threading
+from base64 import b64encode
+from core.log import log
+
+
+class ImageTransport:
+    """
+    图片交给 OCR 引擎的传输方式，按图片大小自动选择：
+    - base64：图片编码为 base64 放进 JSON 指令（体积增加 1/3，引擎还要再解码一次），适合小图片；
+    - file：图片写入内存文件系统（有 /dev/shm 时）或系统临时目录下的临时文件，指令中只传 image_path，适合大图片。
+    远程引擎无法读取本机文件，只能使用 base64（fileThreshold=None）。
+    """
+
+    def __init__(self, fileThreshold=64 * 1024, directory=None, suffix=".bmp"):
+        """
+        :param fileThreshold: 图片字节数不小于该值时使用临时文件，为 None 时始终使用 base64
+        :param directory: 临时文件目录，为 None 时优先使用 /dev/shm
+        :param suffix: 临时文件扩展名
+        """
+        self.fileThreshold = fileThreshold
+        self.directory = directory or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def choose(self, imageBytes):
+        """
+        :return: 该图片使用的传输方式，"base64" 或 "file"
+        """
+        if self.fileThreshold is not None and len(imageBytes) >= self.fileThreshold:
+            return "file"
+        return "base64"
+
+    def run(self, runDict, imageBytes):
+        """
+        用选定的传输方式识别一张图片
+        :param runDict: 发送指令字典的函数，如 PPOCR_pipe.runDict
+        :param imageBytes: 图片字节流
+        :return: {"code": 识别码, "data": 内容列表或错误信息字符串}
+        """
+        transport = self.choose(imageBytes)
+        start = time.perf_counter()
+        if transport == "file":
+            res = self._run_file(runDict, imageBytes)
+            if res is None:
+                transport = "base64"
+                res = runDict({"image_base64": b64encode(imageBytes).decode("utf-8")})
+        else:
+            res = runDict({"image_base64": b64encode(imageBytes).decode("utf-8")})
+        self._record(transport, len(imageBytes), time.perf_counter() - start)
+        return res
+
+    def _run_file(self, runDict, imageBytes):
+        """写入临时文件并识别，写入失败时返回 None（退回 base64）"""
+        try:
+            fd, path = tempfile.mkstemp(suffix=self.suffix, prefix="hdh_ocr_", dir=self.directory)
+        except OSError as e:
+            log.debug(f"创建 OCR 临时文件失败，改用 base64：{e}")
+            return None
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(imageBytes)
+            return runDict({"image_path": path})
+        finally:
+            try:
+                os.remove(path)
+            except OSError as e:
+                log.debug(f"删除 OCR 临时文件失败：{path}，{e}")
+
+    def _record(self, transport, size, elapsed):
+        with self._lock:
+            stat = self._stats.setdefault(transport, [0, 0, 0.0])
+            stat[0] += 1
+            stat[1] += size
+            stat[2] += elapsed
+
+    def stats(self):
+        """
+        :return: {传输方式: {"count": 次数, "avg_kb": 平均图片大小, "avg_ms": 平均耗时（含识别）, "mb_per_s": 吞吐量}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": count,
+                    "avg_kb": round(size / count / 1024, 1),
+                    "avg_ms": round(elapsed * 1000 / count, 2),
+                    "mb_per_s": round(size / elapsed / 1024 / 1024, 2) if elapsed else 0.0,
+                }
+                for name, (count, size, elapsed) in self._stats.items()
+            }
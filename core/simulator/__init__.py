@@ -1,4 +1,5 @@
 from .simulator_controller import SimulatorController
+from .controller_manager import ControllerManager
 
-simulator_controller = SimulatorController(16384)
-# simulator_controller = SimulatorController(16416)
+# 默认连接的模拟器端口，多开时通过 main.py --ports 指定，如 --ports 16384 16416
+DEFAULT_PORTS = [16384]
@@ -0,0 +1,210 @@
+import time
+import socket
+import threading
+from core.log import log
+
+
+class AdbError(Exception):
+    """adb server 返回 FAIL 或连接被意外关闭"""
+
+
+class AdbClient:
+    """
+    直接通过 ADB 协议与本地 adb server 通信的客户端，避免每条命令都重新启动一个 adb 进程。
+    点击、滑动等输入命令复用一条常驻的 shell 会话；截图等二进制输出走 exec 通道。
+    """
+
+    def __init__(self, serial, host="127.0.0.1", port=5037, timeout=10):
+        """
+        :param serial: 设备序列号，如 127.0.0.1:16384
+        :param host: adb server 地址
+        :param port: adb server 端口
+        :param timeout: 套接字超时时间（秒）
+        """
+        self.serial = serial
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._session = None
+        self._reader = None
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {}
+
+    def shell(self, command):
+        """
+        在常驻 shell 会话中执行命令。命令发出之前会话断开时自动重连并重试一次；
+        命令发出之后读取输出失败时不再重试（命令可能已经执行，点击、滑动重复执行会出错），直接抛出异常
+        :param command: shell 命令
+        :return: 命令输出文本
+        """
+        with self._lock:
+            start = time.perf_counter()
+            for attempt in range(2):
+                try:
+                    if self._session is None:
+                        self._open_session()
+                    marker = self._send_command(command)
+                    break
+                except (OSError, AdbError) as e:
+                    self._close_session()
+                    if attempt:
+                        raise
+                    log.debug(f"adb shell 会话异常，正在重连: {e}")
+            try:
+                output = self._read_output(marker)
+            except (OSError, AdbError):
+                self._close_session()
+                raise
+        self._record(command, start)
+        return output
+
+    def exec_out(self, command, size_hint=None):
+        """
+        通过 exec 通道执行命令并读取全部二进制输出（不经过 pty，无需处理 \\r\\n）
+        :param command: shell 命令
+        :param size_hint: 预计输出大小，用于一次性分配接收缓冲区
+        :return: 命令输出的字节数据（bytearray，可直接交给 np.frombuffer 共享内存）
+        """
+        start = time.perf_counter()
+        sock = self._open()
+        try:
+            self._send_request(sock, f"exec:{command}")
+            data = self._recv_all(sock, size_hint + 4096 if size_hint else 1 << 20)
+        finally:
+            sock.close()
+        self._record(command, start)
+        return data
+
+    def close(self):
+        """关闭常驻 shell 会话"""
+        with self._lock:
+            self._close_session()
+
+    def latency_report(self):
+        """
+        汇总每类命令的耗时
+        :return: {命令名: {"count": 次数, "avg_ms": 平均耗时, "max_ms": 最大耗时}}
+        """
+        with self._stats_lock:
+            return {
+                name: {
+                    "count": stat["count"],
+                    "avg_ms": round(stat["total_ms"] / stat["count"], 1),
+                    "max_ms": round(stat["max_ms"], 1),
+                }
+                for name, stat in self.stats.items()
+            }
+
+    def _record(self, command, start):
+        """记录单条命令的耗时，按命令名（第一个单词）分类统计"""
+        elapsed = (time.perf_counter() - start) * 1000
+        name = command.split(" ", 1)[0]
+        with self._stats_lock:
+            stat = self.stats.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stat["count"] += 1
+            stat["total_ms"] += elapsed
+            stat["max_ms"] = max(stat["max_ms"], elapsed)
+        log.debug(f"adb 命令 [{command}] 耗时 {elapsed:.1f}ms")
+
+    def _open(self):
+        """连接 adb server 并切换到目标设备"""
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            self._send_request(sock, f"host:transport:{self.serial}")
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def _open_session(self):
+        """打开常驻 shell 会话（带命令的 shell 服务不分配 pty，输出不会被改写）"""
+        sock = self._open()
+        try:
+            self._send_request(sock, "shell:sh")
+        except Exception:
+            sock.close()
+            raise
+        self._session = sock
+        self._reader = sock.makefile("rb")
+        log.debug(f"已建立常驻 adb shell 会话：{self.serial}")
+
+    def _close_session(self):
+        for closable in (self._reader, self._session):
+            if closable is not None:
+                try:
+                    closable.close()
+                except OSError:
+                    pass
+        self._session = None
+        self._reader = None
+
+    def _send_command(self, command):
+        """
+        向常驻会话写入命令，命令之后输出本条命令专属的结束标记
+        :return: 结束标记
+        """
+        self._seq += 1
+        marker = f"__HDH_END_{self._seq}__"
+        # 标记前先输出一个换行，命令输出不以换行结尾时标记也总是独占一行
+        self._session.sendall(f"{{ {command}; }} 2>&1; printf '\\n%s\\n' {marker}\n".encode("utf-8"))
+        return marker
+
+    def _read_output(self, marker):
+        """读取命令输出，直到遇到结束标记"""
+        lines = []
+        while True:
+            line = self._reader.readline()
+            if not line:
+                raise AdbError("adb shell 会话已被关闭")
+            text = line.decode("utf-8", errors="ignore").rstrip("\r\n")
+            if text == marker:
+                # 标记前的最后一行以补上的换行结尾：为空说明输出本身以换行结尾（或没有输出），去掉；否则是输出中未换行的最后一行
+                if lines and not lines[-1]:
+                    lines.pop()
+                return "\n".join(lines)
+            lines.append(text)
+
+    @staticmethod
+    def _send_request(sock, request):
+        """按 ADB 协议发送请求（4 位十六进制长度 + 内容）并检查 OKAY/FAIL"""
+        data = request.encode("utf-8")
+        sock.sendall(b"%04x" % len(data) + data)
+        status = AdbClient._recv_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            length = int(AdbClient._recv_exact(sock, 4), 16)
+            message = AdbClient._recv_exact(sock, length).decode("utf-8", errors="ignore")
+            raise AdbError(f"adb 请求 {request} 失败: {message}")
+        raise AdbError(f"adb 请求 {request} 返回未知状态: {status!r}")
+
+    @staticmethod
+    def _recv_exact(sock, size):
+        buf = bytearray(size)
+        view = memoryview(buf)
+        received = 0
+        while received < size:
+            n = sock.recv_into(view[received:])
+            if n == 0:
+                raise AdbError("adb 连接被意外关闭")
+            received += n
+        return bytes(buf)
+
+    @staticmethod
+    def _recv_all(sock, buffer_size):
+        """读取直到对端关闭连接，接收缓冲区按需倍增，避免 bytes 反复拼接"""
+        buf = bytearray(buffer_size)
+        size = 0
+        while True:
+            if size == len(buf):
+                buf.extend(bytes(len(buf)))
+            with memoryview(buf) as view:
+                n = sock.recv_into(view[size:])
+            if n == 0:
+                break
+            size += n
+        del buf[size:]
+        return buf
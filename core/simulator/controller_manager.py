@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from core.log import log
+from utils.ocr_profile import OcrProfile
+from utils.template_bank import TemplateBank
+from .simulator_controller import SimulatorController
+
+
+class ControllerManager:
+    """
+    多模拟器管理：为每个 adb 端口创建一个 SimulatorController，各设备按序列号（adb -s）单独寻址，
+    所有控制器共用同一个模板图片库和 OCR 预处理参数，模板只加载一次。
+    """
+
+    def __init__(self, ports, template_bank=None, ocr_profile=None, **kwargs):
+        """
+        :param ports: 模拟器 adb 端口列表，如 [16384, 16416]
+        :param template_bank: 共用的模板图片库，为 None 时使用 ./res/image
+        :param ocr_profile: 共用的 OCR 预处理参数，为 None 时读取 ./res/ocr_profile.json
+        :param kwargs: 传给每个 SimulatorController 的其他参数（capture_mode、frame_max_age_ms）
+        """
+        self.templates = template_bank or TemplateBank()
+        self.ocr_profile = ocr_profile or OcrProfile.load()
+        self.controllers = [
+            SimulatorController(port, template_bank=self.templates, ocr_profile=self.ocr_profile, **kwargs)
+            for port in dict.fromkeys(ports)
+        ]
+
+    def connect_all(self):
+        """
+        并行连接全部模拟器，单个设备连接失败不影响其他设备
+        :return: 连接成功的控制器列表
+        """
+        with ThreadPoolExecutor(max_workers=len(self.controllers) or 1) as executor:
+            results = list(executor.map(lambda controller: controller.connect(), self.controllers))
+        connected = [controller for controller, ok in zip(self.controllers, results) if ok]
+        log.info(f"已连接 {len(connected)}/{len(self.controllers)} 个模拟器")
+        return connected
+
+    def disconnect_all(self):
+        for controller in self.connected:
+            controller.disconnect()
+
+    @property
+    def connected(self):
+        return [controller for controller in self.controllers if controller.connected]
+
+    def get(self, serial):
+        """按序列号（如 127.0.0.1:16384）或端口号查找控制器，不存在时返回 None"""
+        for controller in self.controllers:
+            if serial in (controller.serial, controller.port):
+                return controller
+        return None
+
+    def __iter__(self):
+        return iter(self.controllers)
+
+    def __len__(self):
+        return len(self.controllers)
+
+    def stats(self):
+        """:return: {序列号: {"adb": adb 命令耗时, "frames": 截图缓存统计}}"""
+        return {
+            controller.serial: {"adb": controller.adb.latency_report(), "frames": controller.frames.stats()}
+            for controller in self.controllers
+        }
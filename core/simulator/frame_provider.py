@@ -0,0 +1,100 @@
+import cv2
+import time
+import threading
+
+
+class FrameProvider:
+    """
+    共享的"最新一帧"缓存：帧足够新且期间没有发送过输入时直接复用，否则重新截图。
+    点击、滑动后调用 invalidate()，保证之后拿到的一定是输入之后的画面。
+    """
+
+    def __init__(self, capture, max_age_ms=500):
+        """
+        :param capture: 实际截图函数，返回帧数组或 None
+        :param max_age_ms: 默认的新鲜度预算（毫秒），超过后重新截图
+        """
+        self._capture = capture
+        self.max_age_ms = max_age_ms
+        self._lock = threading.Lock()
+        self._frame = None
+        self._timestamp = 0.0  # 缓存帧开始截图的时间
+        self._refreshed_at = 0.0  # 最近一次 refresh() 的时间，早于它开始截取的帧不再复用
+        self._frame_epoch = -1
+        # (帧, {转换代码: 转换结果})，整体替换，其他线程读到的帧和转换结果总是对应的
+        self._converted = (None, {})
+        self.epoch = 0  # 每次输入后自增，用于判断缓存帧是否早于最近一次输入
+        self.captures = 0
+        self.hits = 0
+
+    def get(self, max_age_ms=None):
+        """
+        获取最新一帧
+        :param max_age_ms: 本次调用可接受的最大帧龄（毫秒），为 None 时使用默认值，为 0 时强制重新截图
+        :return: 只读的帧数组，截图失败返回 None
+        """
+        if max_age_ms is None:
+            max_age_ms = self.max_age_ms
+
+        # 截图期间持有锁，并发调用方会等待并直接复用这一帧
+        with self._lock:
+            if (self._frame is not None and self._frame_epoch == self.epoch
+                    and self._timestamp >= self._refreshed_at
+                    and (time.monotonic() - self._timestamp) * 1000 <= max_age_ms):
+                self.hits += 1
+                return self._frame
+
+            epoch = self.epoch
+            start = time.monotonic()
+            frame = self._capture()
+            if frame is None:
+                return None
+            # 缓存帧被多个调用方共享，禁止就地修改
+            frame.flags.writeable = False
+            self.captures += 1
+            self._frame = frame
+            self._converted = (frame, {})
+            self._timestamp = start
+            # 截图过程中若有输入发生，epoch 已变化，下次调用会重新截图
+            self._frame_epoch = epoch
+            return frame
+
+    def convert(self, frame, code):
+        """
+        对帧做颜色空间转换（如转 BGR、转灰度），同一缓存帧的同一种转换只做一次
+        :param frame: get() 返回的帧
+        :param code: cv2.cvtColor 的转换代码
+        :return: 转换后的只读数组
+        """
+        # 只读取一次，避免判断帧之后 get() 在其他线程中换上新帧，把旧帧的转换结果存进新帧的缓存
+        cached_frame, converted = self._converted
+        if cached_frame is not frame:
+            converted = {}
+        image = converted.get(code)
+        if image is None:
+            image = cv2.cvtColor(frame, code)
+            image.flags.writeable = False
+            converted[code] = image
+        return image
+
+    def invalidate(self):
+        """发送输入后调用，使当前缓存帧失效"""
+        self.epoch += 1
+
+    def refresh(self):
+        """
+        不发送输入、只需要新画面时调用（如轮询等待动画结束），使当前缓存帧过期。
+        与 invalidate 不同，不改变 epoch，流水线中已截取的帧不会因此被当作输入之前的旧帧丢弃
+        """
+        self._refreshed_at = time.monotonic()
+
+    def stats(self):
+        """
+        :return: {"captures": 实际截图次数, "hits": 缓存命中次数, "hit_rate": 命中率}
+        """
+        total = self.captures + self.hits
+        return {
+            "captures": self.captures,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -1,41 +1,58 @@
-import io
+import os
 import cv2
 import math
+import time
 import traceback
 import subprocess
 import numpy as np
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from core.log import log
-from PIL import Image, ImageDraw, ImageEnhance
 from utils.image_utils import ImageUtils
+from utils.ocr_profile import OcrProfile
+from utils.template_bank import TemplateBank
+from utils.template_manifest import TemplateManifest
+from .adb_client import AdbClient
+from .frame_provider import FrameProvider
 
 
 class SimulatorController:
-    def __init__(self, port):
+    def __init__(self, port, capture_mode="raw", frame_max_age_ms=500, template_bank=None, ocr_profile=None):
+        """
+        :param port: 模拟器 adb 端口
+        :param capture_mode: 截图方式，raw 直接读取原始帧缓冲，png 使用 screencap -p
+        :param frame_max_age_ms: 截图缓存的新鲜度预算（毫秒），期间未发送输入则复用同一帧
+        :param template_bank: 模板图片库，为 None 时使用 ./res/image
+        :param ocr_profile: OCR 预处理参数（报纸格子区域、对比度、亮度等），为 None 时读取 ./res/ocr_profile.json
+        """
         self.port = port
-        self.img_cache = {}
+        self.serial = f"127.0.0.1:{port}"
+        self.adb = AdbClient(self.serial)
+        self.capture_mode = capture_mode
+        self._frame_size = None
+        self.frames = FrameProvider(self._grab_frame, frame_max_age_ms)
+        self.templates = template_bank or TemplateBank()
+        self.ocr_profile = ocr_profile or OcrProfile.load()
+        self._match_executor = None
         self.connected = False
 
     def connect(self):
         """
-        连接到 MuMu 模拟器
+        连接到 MuMu 模拟器。只连接本实例的端口，不影响同一 adb server 上的其他模拟器
         :return: 连接成功返回 True，否则返回 False
         """
         try:
-            # 断开所有已连接的设备
-            subprocess.run(["adb", "disconnect"], capture_output=True)
-            log.debug("启动前先断开所有已连接的设备。将重新连接端口")
-
-            # 尝试连接到指定端口的模拟器
-            result = subprocess.run(["adb", "connect", f"127.0.0.1:{self.port}"], capture_output=True, text=True)
+            # 尝试连接到指定端口的模拟器，已连接时 adb 返回 already connected
+            result = subprocess.run(["adb", "connect", self.serial], capture_output=True, text=True)
             log.debug(result.stdout)  # 打印连接结果
 
-            if "connected" in result.stdout:
+            # 按序列号确认设备状态，offline 的设备 connect 也会返回 connected
+            state = subprocess.run(["adb", "-s", self.serial, "get-state"], capture_output=True, text=True)
+            if "connected" in result.stdout and state.stdout.strip() == "device":
                 log.info(f"成功连接到 MuMu 模拟器——端口：{self.port}")
                 self.connected = True
                 return True
             else:
-                log.info("连接失败，请检查 MuMu 模拟器是否已启动。")
+                log.info(f"连接失败，请检查 MuMu 模拟器是否已启动。端口：{self.port}")
                 self.connected = False
                 return False
         except Exception as e:
@@ -49,7 +66,8 @@ class SimulatorController:
         :return: 断开成功返回 True，否则返回 False
         """
         try:
-            result = subprocess.run(["adb", "disconnect", f"127.0.0.1:{self.port}"], capture_output=True, text=True)
+            self.adb.close()
+            result = subprocess.run(["adb", "disconnect", self.serial], capture_output=True, text=True)
             log.debug(result.stdout)  # 打印断开连接结果
             if "disconnected" in result.stdout:
                 log.debug("成功断开与 MuMu 模拟器的连接！")
@@ -73,8 +91,9 @@ class SimulatorController:
             return False
 
         try:
-            # 使用 adb shell input tap 命令模拟点击
-            subprocess.run(["adb", "shell", "input", "tap", str(x), str(y)])
+            # 通过常驻 shell 会话执行 input tap 命令模拟点击
+            self.adb.shell(f"input tap {x} {y}")
+            self.frames.invalidate()
             log.debug(f"模拟点击成功，坐标: ({x}, {y})")
             return True
         except Exception as e:
@@ -95,8 +114,9 @@ class SimulatorController:
             return
 
         try:
-            # 使用 adb shell input swipe 命令模拟滑动
-            subprocess.run(["adb", "shell", "input", "swipe", str(x1), str(y1), str(x2), str(y2), str(duration)])
+            # 通过常驻 shell 会话执行 input swipe 命令模拟滑动
+            self.adb.shell(f"input swipe {x1} {y1} {x2} {y2} {duration}")
+            self.frames.invalidate()
             log.debug(f"模拟滑动成功，从 ({x1}, {y1}) 到 ({x2}, {y2}),持续时间: {duration}ms")
         except Exception as e:
             log.debug(f"模拟滑动失败: {e}")
@@ -110,59 +130,87 @@ class SimulatorController:
             log.debug("未连接到模拟器，请先调用 connect() 方法。")
             return
 
+        frame = self.capture_frame()
+        if frame is None:
+            return None
+
         try:
-            # 使用 adb shell screencap 命令截取屏幕
-            result = subprocess.run(["adb", "shell", "screencap", "-p"], capture_output=True)
+            if enhance:
+                # 格子以外涂白、增强对比度和亮度、转灰度，参数见 res/ocr_profile.json
+                profile = self.ocr_profile
+                gray, _ = ImageUtils.enhance_for_ocr(frame, profile.rows, profile.cols,
+                                                     profile.contrast, profile.brightness)
 
-            # 清理输出数据：去除多余的换行符
-            screenshot_data = result.stdout.replace(b"\r\n", b"\n")
+                # 调试时显示图像
+                # cv2.imshow('enhanced', gray)
+                # cv2.waitKey(0)
 
-            # 将二进制数据转换为图像
-            image = Image.open(io.BytesIO(screenshot_data))
+                # 使用不压缩的 BMP 交给 OCR，省去 PNG 压缩
+                return ImageUtils.encode_image(gray)
 
-            # 获取图像的分辨率
-            width, height = image.size
-            # print(f"截图的分辨率: {width}x{height}")
+            return ImageUtils.encode_image(cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR))
+        except Exception as e:
+            log.debug(f"截图失败: {e}")
+            return None
 
-            if enhance:
-                # 在内存中修改图像：控制涂白的高度
-                draw = ImageDraw.Draw(image)
-                draw.rectangle([(0, 0), (width, 100)], fill="white")
-                draw.rectangle([(0, 145), (width, 420)], fill="white")
-                draw.rectangle([(0, 460), (width, 730)], fill="white")
-                draw.rectangle([(0, 780), (width, height)], fill="white")
-
-                draw.rectangle([(0, 0), (300, height)], fill="white")
-                draw.rectangle([(530, 0), (650, height)], fill="white")
-                draw.rectangle([(900, 0), (1070, height)], fill="white")
-                draw.rectangle([(1280, 0), (1420, height)], fill="white")
-                draw.rectangle([(1600, 0), (width, height)], fill="white")
-                # 增强对比度
-                enhancer = ImageEnhance.Contrast(image)
-                image = enhancer.enhance(2)
-
-                # 增强亮度
-                enhancer = ImageEnhance.Brightness(image)
-                image = enhancer.enhance(3)
-                # 转为灰度图（替代OpenCV预处理）
-                image = image.convert('L')
-                # 放大倍率
-                # scale_percent = 100  # 放大200%
-                #
-                # # 计算新的宽度和高度
-                # width = int(image.width * scale_percent / 100)
-                # height = int(image.height * scale_percent / 100)
-                #
-                # # 调整图像大小
-                # image = image.resize((width, height), Image.BICUBIC)
-
-            # 调试时显示图像
-            # image.show()
-
-            with BytesIO() as byte_stream:
-                image.save(byte_stream, format='PNG')
-                byte_data = byte_stream.getvalue()  # 在流关闭前获取数据
-            return byte_data
+    def take_newspaper_mosaic(self, frame=None):
+        """
+        只截取报纸格子区域，拼成一张紧凑的小图交给 OCR，处理方式与 take_screenshot(enhance=True) 相同
+        :param frame: 已截取的帧（capture_frame 的返回值），为 None 时重新获取
+        :return: (图片字节, 坐标映射)，坐标映射交给 OcrResult.remap 换算回屏幕坐标；失败返回 (None, None)
+        """
+        if frame is None:
+            frame = self.capture_frame()
+        if frame is None:
+            return None, None
+
+        try:
+            profile = self.ocr_profile
+            mosaic, mosaic_map = ImageUtils.enhance_for_ocr(frame, profile.rows, profile.cols, profile.contrast,
+                                                            profile.brightness, gap=profile.mosaic_gap)
+            return ImageUtils.encode_image(mosaic), mosaic_map
+        except Exception as e:
+            log.debug(f"截取报纸格子失败: {e}")
+            return None, None
+
+    def capture_frame(self, max_age_ms=None):
+        """
+        获取屏幕画面数组，模板匹配与 OCR 共用同一份数据。
+        最近一帧足够新且之后没有点击/滑动时直接复用，不重新截图。
+        :param max_age_ms: 可接受的最大帧龄（毫秒），为 None 时使用默认值，为 0 时强制重新截图
+        :return: RGBA 格式的 (高, 宽, 4) 只读数组，失败返回 None
+        """
+        if not self.connected:
+            log.debug("未连接到模拟器，请先调用 connect() 方法。")
+            return None
+        return self.frames.get(max_age_ms)
+
+    def capture_gray_frame(self, max_age_ms=None):
+        """
+        获取灰度屏幕画面，与模板匹配共用同一帧的灰度转换结果
+        :param max_age_ms: 同 capture_frame
+        :return: (高, 宽) 的只读灰度数组，失败返回 None
+        """
+        frame = self.capture_frame(max_age_ms)
+        if frame is None:
+            return None
+        return self.frames.convert(frame, cv2.COLOR_RGBA2GRAY)
+
+    def _grab_frame(self):
+        """
+        实际截图。raw 模式下直接读取 screencap 原始帧缓冲，数组与接收缓冲区共享内存，没有任何 PNG 编解码。
+        :return: RGBA 格式的 (高, 宽, 4) 数组，失败返回 None
+        """
+        try:
+            if self.capture_mode == "raw":
+                data = self.adb.exec_out("screencap", self._frame_size)
+                self._frame_size = len(data)
+                return ImageUtils.parse_raw_screencap(data)
+
+            data = self.adb.exec_out("screencap -p", self._frame_size)
+            self._frame_size = len(data)
+            image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGBA)
         except Exception as e:
             log.debug(f"截图失败: {e}")
             return None
@@ -175,39 +223,107 @@ class SimulatorController:
         return self.connected
 
     def find_element(self, target, threshold=0.9,enable_scaling=False):
-        now_image_name = target.replace('./res/', '')
-        log.debug(f"本次查找的图片路径为------：" + now_image_name)
-
         # 捕获游戏窗口，判断是否在游戏窗口内进行截图
-        screenshot_result = self.take_screenshot()
-        if not screenshot_result:
+        frame = self.capture_frame()
+        if frame is None:
             log.debug("截图失败")
             return None
 
+        return self._match_element(frame, target, threshold, enable_scaling)
+
+    def find_all(self, targets, threshold=0.9, enable_scaling=False, parallel=True):
+        """
+        在同一帧截图上一次性匹配多张模板图片。
+
+        参数:
+        :param targets: 图片路径列表
+        :param threshold: 查找阈值
+        :param enable_scaling: 是否启用缩放功能
+        :param parallel: 是否在线程池中并行匹配（OpenCV 匹配时会释放 GIL）
+
+        返回:
+        {图片路径: find_element 的返回值}，截图失败返回 None
+        """
+        frame = self.capture_frame()
+        if frame is None:
+            log.debug("截图失败")
+            return None
+
+        if parallel and len(targets) > 1:
+            results = self._get_match_executor().map(
+                lambda target: self._match_element(frame, target, threshold, enable_scaling), targets)
+        else:
+            results = (self._match_element(frame, target, threshold, enable_scaling) for target in targets)
+        return dict(zip(targets, results))
+
+    def find_any(self, targets, threshold=0.9, enable_scaling=False, parallel=True):
+        """
+        在同一帧截图上匹配多张模板图片，返回按列表顺序第一个找到的结果。
+
+        参数:
+        :param targets: 图片路径列表
+        :param threshold: 查找阈值
+        :param enable_scaling: 是否启用缩放功能
+        :param parallel: 是否在线程池中并行匹配
+
+        返回:
+        (图片路径, find_element 的返回值)，均未找到返回 None
+        """
+        results = self.find_all(targets, threshold, enable_scaling, parallel)
+        if not results:
+            return None
+        for target in targets:
+            if results[target]:
+                return target, results[target]
+        return None
+
+    def _get_match_executor(self):
+        if self._match_executor is None:
+            self._match_executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                                                      thread_name_prefix="template-match")
+        return self._match_executor
+
+    def _match_element(self, frame, target, threshold, enable_scaling):
+        """
+        在给定的帧上查找模板图片。按模板配置的颜色模式使用灰度图（默认）或 BGR 彩色图匹配。
+        :return: (中心横坐标, 中心纵坐标, 相似度)，未找到返回 None
+        """
+        now_image_name = target.replace('./res/', '')
+        log.debug(f"本次查找的图片路径为------：" + now_image_name)
+
         try:
-            if target in self.img_cache:
-                mask = self.img_cache[target]['mask']
-                template = self.img_cache[target]['template']
+            # 从模板图片库获取预先加载、缩放好的模板和掩码
+            entry = self.templates.get(target)
+            mask = entry.mask
+            if TemplateManifest.is_grayscale(target):
+                screenshot = self.frames.convert(frame, cv2.COLOR_RGBA2GRAY)
+                template, variants = entry.gray, entry.gray_variants
             else:
-                mask = ImageUtils.read_template_with_mask(target)  # 读取模板图片掩码
-                template = cv2.imread(target)  # 读取模板图片
-                self.img_cache[target] = {'mask': mask, 'template': template}
+                screenshot = self.frames.convert(frame, cv2.COLOR_RGBA2BGR)
+                template, variants = entry.image, entry.variants
 
-            # 将二进制数据转换为 OpenCV 图像（BGR 格式）
-            screenshot = cv2.imdecode(np.frombuffer(screenshot_result, np.uint8), cv2.IMREAD_COLOR)
+            # 模板配置了搜索区域时只在该区域内匹配，匹配耗时与面积成正比
+            region, (offset_x, offset_y) = ImageUtils.crop_roi(screenshot, TemplateManifest.roi(target),
+                                                               template.shape)
 
             if mask is not None:
                 # 执行匹配模板
                 if enable_scaling:
-                    matchVal, matchLoc = ImageUtils.scale_and_match_template(screenshot, template, threshold, mask)
+                    matchVal, matchLoc = ImageUtils.scale_and_match_template(region, template, threshold, mask,
+                                                                             variants=variants)
                 else:
-                    matchVal, matchLoc = ImageUtils.match_template(screenshot, template, threshold, mask)
+                    matchVal, matchLoc = ImageUtils.match_template(region, template, threshold, mask)
             else:
                 if enable_scaling:
-                    matchVal, matchLoc = ImageUtils.scale_and_match_template(screenshot, template, threshold, mask)
+                    matchVal, matchLoc = ImageUtils.scale_and_match_template(region, template, threshold, mask,
+                                                                             variants=variants)
                 # 执行匹配模板
                 else:
-                    matchVal, matchLoc = ImageUtils.match_template(screenshot, template, threshold, None)
+                    matchVal, matchLoc = ImageUtils.match_template(region, template, threshold, None)
+
+            # 将区域内坐标换算回整张截图的坐标
+            if matchLoc != (-1, -1):
+                matchLoc = (matchLoc[0] + offset_x, matchLoc[1] + offset_y)
 
             # # 获取模板图像的宽度和高度
             # template_width = template.shape[1]
@@ -259,6 +375,82 @@ class SimulatorController:
             return self.click(top_left, bottom_right)
         return False
 
+    def wait_until(self, predicate, timeout=3.0, poll_interval=0.1, fresh=True):
+        """
+        轮询等待条件成立，代替固定时长的 sleep，界面就绪后立即返回。
+
+        参数:
+        :param predicate: 无参数的判断函数，返回真值表示条件成立
+        :param timeout: 最长等待时间（秒）
+        :param poll_interval: 两次判断之间的间隔（秒）
+        :param fresh: 每次判断前使截图缓存过期（不改变输入 epoch），保证判断函数看到的是新截图
+
+        返回:
+        条件成立时返回判断函数的返回值，超时返回 None
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            if fresh:
+                self.frames.refresh()
+            result = predicate()
+            if result:
+                log.debug(f"等待完成，耗时 {(time.monotonic() - start) * 1000:.0f}ms")
+                return result
+            if time.monotonic() >= deadline:
+                log.debug(f"等待超时（{timeout}s）")
+                return None
+            time.sleep(poll_interval)
+
+    def wait_for_element(self, targets, timeout=3.0, poll_interval=0.1, threshold=0.9, enable_scaling=False):
+        """
+        等待任意一张模板图片出现在屏幕上
+        :param targets: 图片路径或图片路径列表
+        :return: (图片路径, find_element 的返回值)，超时返回 None
+        """
+        targets = [targets] if isinstance(targets, str) else list(targets)
+        return self.wait_until(lambda: self.find_any(targets, threshold, enable_scaling), timeout, poll_interval)
+
+    def wait_for_element_gone(self, target, timeout=3.0, poll_interval=0.1, threshold=0.9):
+        """
+        等待模板图片从屏幕上消失
+        :return: 消失返回 True，超时返回 None
+        """
+        return self.wait_until(lambda: self.capture_frame() is not None and not self.find_element(target, threshold),
+                               timeout, poll_interval)
+
+    def wait_for_stable(self, region=None, timeout=3.0, poll_interval=0.1, stable_count=2, tolerance=2.0):
+        """
+        等待画面（或其中一个区域）停止变化，用于翻页、滑动等动画结束的判断。
+        每次截图缩成小灰度图，与上一次相比平均灰度差不超过 tolerance 的次数连续达到 stable_count 时认为画面已稳定。
+
+        参数:
+        :param region: 检测区域 (x, y, 宽, 高)，为 None 时检测整个画面
+        :param stable_count: 需要连续稳定的次数
+        :param tolerance: 允许的平均灰度差
+
+        返回:
+        稳定返回 True，超时返回 None
+        """
+        state = {"previous": None, "stable": 0}
+
+        def is_stable():
+            gray = self.capture_gray_frame()
+            if gray is None:
+                return False
+            gray, _ = ImageUtils.crop_roi(gray, region)
+            height, width = gray.shape
+            thumbnail = cv2.resize(gray, (max(1, width // 20), max(1, height // 20)),
+                                   interpolation=cv2.INTER_AREA).astype(np.int16)
+            previous, state["previous"] = state["previous"], thumbnail
+            if previous is not None and np.abs(thumbnail - previous).mean() <= tolerance:
+                state["stable"] += 1
+            else:
+                state["stable"] = 0
+            return state["stable"] >= stable_count
+
+        return self.wait_until(is_stable, timeout, poll_interval)
+
 
 from pathlib import Path
 import os
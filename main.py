@@ -1,23 +1,22 @@
 import time
+import argparse
 import keyboard
 import threading
 from core.log import log
 from core.console import console
-from core.ocr.PPOCR_api import GetOcrApi
-from utils.ocr_analysis import OcrAnalysis
-from core.simulator import simulator_controller as simulator
+from core.ocr.ocr_pool import OcrPool
+from core.ocr.ocr_cache import OcrCache
+from core.bot.newspaper_bot import NewspaperBot
+from core.bot.scheduler import Scheduler, ThreadedScheduler
+from core.bot.page_pipeline import PagePipeline
+from core.bot.coordinator import ProcessCoordinator
+from core.simulator import ControllerManager, DEFAULT_PORTS
 
 orc_path = 'core/ocr/PaddleOCR/PaddleOCR-json.exe'
 
 # 全局停止标志
 stop_flag = True
-# 初始化计数器
-counter = 1
-# 存储报纸每页的数据
-corner_texts_storage = {}
 lock = threading.Lock()  # 线程锁
-# 统计计数器
-refresh_counter = 0
 
 
 def keyboard_listener():
@@ -43,166 +42,114 @@ def keyboard_listener():
     keyboard.unhook_all()
 
 
+def should_stop():
+    with lock:
+        return not stop_flag
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HayDayHelper")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="截图、预处理、OCR 分线程流水线执行，上一帧识别时同时截取下一帧；默认在主线程中顺序执行")
+    parser.add_argument("--ports", type=int, nargs="+", default=DEFAULT_PORTS,
+                        help="模拟器 adb 端口，多开时同时指定多个，如 --ports 16384 16416")
+    parser.add_argument("--processes", action="store_true",
+                        help="每个模拟器一个工作进程，OCR 引擎由主进程集中提供，图片通过共享内存传递；默认所有模拟器在同一进程中运行")
+    return parser.parse_args()
+
+
 def main():
-    global stop_flag, counter, corner_texts_storage, refresh_counter
+    global stop_flag
+    args = parse_args()
 
     print("程序启动...")
     key, label = console.run()
     log.info(f"当前选择商品：{key}")
 
-    if not simulator.connect():
+    if args.processes:
+        return run_processes(args, key, label)
+
+    # 每个端口一个控制器，共用模板图片库
+    manager = ControllerManager(args.ports)
+    simulators = manager.connect_all()
+    if not simulators:
         return
 
-    ocr = GetOcrApi(orc_path)
+    # 启动时一次性加载全部模板图片
+    manager.templates.load_all()
+
+    # 所有设备共用一个引擎进程池；引擎崩溃时自动重启，内容未变化的报纸截图直接复用上次的识别结果
+    ocr = OcrCache(OcrPool(orc_path, size=max(2, len(simulators))))
 
     # 启动键盘监听线程
     keyboard_thread = threading.Thread(target=keyboard_listener, daemon=True)
     keyboard_thread.start()
 
+    # 每个设备一个流程实例；全部商品名称用于模糊匹配，识别文本只归给其中最相似的一个
+    bots = [NewspaperBot(simulator, ocr, key, label, console.product_labels(), name=simulator.serial)
+            for simulator in simulators]
+    pipelines = []
+    if args.pipeline:
+        for bot in bots:
+            pipeline = PagePipeline(bot, ocr_workers=max(1, ocr.size // len(bots))).start()
+            bot.page_source = pipeline.next_page
+            pipelines.append(pipeline)
+
+    # 多个设备时每个设备一个线程，互不等待
+    scheduler = (ThreadedScheduler if len(bots) > 1 else Scheduler)(should_stop)
+    for bot in bots:
+        scheduler.add(bot.machine)
+
     try:
-        while True:
-            with lock:
-                if not stop_flag:
-                    log.info("收到停止信号,即将退出主循环")
-                    break
-
-            log.debug(f"当前计数: {counter}")
-            screenshot = simulator.take_screenshot(enhance=True)
-            ocr_res = ocr.runBytes(screenshot)
-
-            if counter <= 5:
-                # 存储左页角标文本
-                current_corner_texts = OcrAnalysis.get_corner_texts(ocr_res)
-                current_corner_texts_all = OcrAnalysis.get_corner_texts(ocr_res, False)
-                corner_texts_storage[counter] = current_corner_texts
-                log.info(f"当前所在 {counter} 页,内容为：{current_corner_texts_all}")
-
-                # 前4页处理逻辑
-                locations = OcrAnalysis.find_trading_location(ocr_res, label)
-
-                if len(locations) > 0:
-                    for loc in locations:
-                        center_x, center_y = loc
-                        simulator.click(center_x, center_y)
-                        time.sleep(1)
-
-                        target = f"./res/image/{key}.png"
-                        found = False
-                        for _ in range(3):
-                            if simulator.click_element(target, enable_scaling=True):
-                                found = True
-                                break
-
-                            if simulator.find_element("./res/image/more1.png") or simulator.find_element(
-                                    "./res/image/more2.png"):
-                                simulator.swipe(1670.0, 450.0, 150.0, 450.0, 800)
-                            else:
-                                break
-
-                        if found:
-                            return
-                        else:
-                            log.info(f"未在小店中找到想要购买的 {label},将重新返回报纸进行刷新")
-                            simulator.click_element("./res/image/return.png")
-                            time.sleep(1)
-
-                    log.info("遍历完所有位置都未找到目标，继续刷新报纸")
-                    refresh_counter += 1
-                    log.info(f"报纸已刷新 {refresh_counter} 次")
-                    break
-                else:
-                    simulator.swipe(1670.0, 1030.0, 870.0, 1030.0)
-                    time.sleep(1)
-            else:
-                screenshot = simulator.take_screenshot(enhance=True)
-                ocr_res = ocr.runBytes(screenshot)
-
-                # 获取当前页的 get_corner_texts
-                current_corner_texts = OcrAnalysis.get_corner_texts(ocr_res)
-
-                # 判断当前页属于哪一页
-                current_page = None
-                for stored_counter, stored_corner_texts in corner_texts_storage.items():
-                    # 比较两个列表是否相同
-                    if set(current_corner_texts) == set(stored_corner_texts):
-                        current_page = stored_counter
-                        break
-
-                if current_page is not None:
-                    log.info(f"当前页属于第 {current_page} 页,内容为：{current_corner_texts}")
-                else:
-                    log.info("页面已刷新,将再次查找")
-                    refresh_counter += 1
-                    log.info(f"报纸已刷新 {refresh_counter} 次")
-                    corner_texts_storage = {counter: current_corner_texts}
-
-                # 后4次遍历所有识别结果
-                for result in ocr_res['data']:
-                    # 每次循环时再次获取当前页的 get_corner_texts
-                    screenshot = simulator.take_screenshot(enhance=True)
-                    ocr_res = ocr.runBytes(screenshot)
-                    current_corner_texts = OcrAnalysis.get_corner_texts(ocr_res)
-
-                    # 判断当前页的 get_corner_texts 是否属于 corner_texts_storage
-                    is_page_refreshed = True
-                    for stored_corner_texts in corner_texts_storage.values():
-                        if current_corner_texts == stored_corner_texts:
-                            is_page_refreshed = False
-                            break
-
-                    if is_page_refreshed:
-                        log.info("页面已刷新，停止当前循环并重置")
-                        refresh_counter += 1
-                        log.info(f"报纸已刷新 {refresh_counter} 次")
-                        corner_texts_storage = {}
-                        counter = 0
-                        break  # 停止当前循环
-
-                    box = result['box']
-                    center_x = sum(p[0] for p in box) / 4
-                    center_y = sum(p[1] for p in box) / 4
-
-                    simulator.click(center_x, center_y)
-                    time.sleep(1)
-
-                    target = f"./res/image/{key}.png"
-                    found = False
-                    for _ in range(3):
-                        with lock:
-                            if not stop_flag:
-                                return
-                        if simulator.click_element(target):
-                            found = True
-                            break
-
-                        if simulator.find_element("./res/image/more1.png") or simulator.find_element(
-                                "./res/image/more2.png"):
-                            simulator.swipe(1670.0, 450.0, 150.0, 450.0, 800)
-                        else:
-                            break
-
-                    if found:
-                        return
-                    else:
-                        log.info(f"未在小店中找到想要购买的 {label},将重新返回报纸进行刷新")
-                        simulator.click_element("./res/image/return.png")
-                        time.sleep(1.5)
-                if counter < 1:
-                    time.sleep(1)
-                elif current_page >= 2:
-                    simulator.swipe(200.0, 1030.0, 1670.0, 1030.0, 800)
-
-            counter += 1
-            with lock:
-                if not stop_flag:
-                    break
+        scheduler.run()
+    finally:
+        with lock:
+            stop_flag = False
+        keyboard_thread.join()
+        for pipeline in pipelines:
+            pipeline.stop()
+        log.info("程序已停止")
+        for bot in bots:
+            log.info(f"[{bot.name}] 报纸总共刷新了 {bot.refresh_counter} 次")
+            for state, stat in bot.machine.stats()["states"].items():
+                log.info(f"[{bot.name}] 状态 {state} 耗时统计：{stat}")
+            log.info(f"[{bot.name}] 状态转移统计：{bot.machine.stats()['transitions']}")
+            log.info(f"[{bot.name}] adb 命令耗时统计：{bot.simulator.adb.latency_report()}")
+            log.info(f"[{bot.name}] 截图缓存统计：{bot.simulator.frames.stats()}")
+            log.info(f"[{bot.name}] 翻页检测统计：{bot.page_detector.stats()}")
+        log.info(f"OCR 结果缓存统计：{ocr.stats()}")
+        log.info(f"OCR 图片传输统计：{ocr.transport.stats()}")
+        for bot, pipeline in zip(bots, pipelines):
+            for stage, stat in pipeline.stats().items():
+                log.info(f"[{bot.name}] 流水线阶段 {stage} 统计：{stat}")
+
+
+def run_processes(args, key, label):
+    """多进程模式：每个端口一个工作进程，主进程负责 OCR、键盘停止信号和统计汇总"""
+    global stop_flag
 
+    ports = list(dict.fromkeys(args.ports))
+    ocr = OcrCache(OcrPool(orc_path, size=max(2, len(ports))))
+    coordinator = ProcessCoordinator(ports, ocr, (key, label, console.product_labels()), pipeline=args.pipeline)
+
+    keyboard_thread = threading.Thread(target=keyboard_listener, daemon=True)
+    keyboard_thread.start()
+
+    try:
+        coordinator.start().run(should_stop)
     finally:
         with lock:
             stop_flag = False
         keyboard_thread.join()
+        coordinator.stop()
         log.info("程序已停止")
-        log.info(f"报纸总共刷新了 {refresh_counter} 次")
+        stats = coordinator.stats()
+        log.info(f"报纸总共刷新了 {stats['refresh_counter']} 次，找到目标的设备：{stats['found']}")
+        for serial, worker in stats["workers"].items():
+            log.info(f"[{serial}] 工作进程统计：{worker}")
+        log.info(f"OCR 服务统计：{stats['ocr_service']}")
+        log.info(f"OCR 结果缓存统计：{ocr.stats()}")
+        log.info(f"OCR 图片传输统计：{ocr.transport.stats()}")
 
 
 if __name__ == '__main__':
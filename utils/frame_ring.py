@@ -0,0 +1,69 @@
+import queue
+from multiprocessing import shared_memory
+
+
+class FrameRing:
+    """
+    基于 multiprocessing.shared_memory 的定长槽环形缓冲区，用于在进程之间传递图片字节，
+    接收方直接从共享内存读取，不经过 pickle 和管道复制。
+    写入方（工作进程）负责分配和归还槽位；创建方（协调进程）负责在结束时释放共享内存。
+    """
+
+    def __init__(self, slots=2, slot_size=4 * 1024 * 1024, name=None):
+        """
+        :param slots: 槽位数量，即同时在途的图片数量上限
+        :param slot_size: 每个槽位的字节数，超过的图片由调用方改用其他方式传递
+        :param name: 已存在的共享内存名称，为 None 时新建
+        """
+        self.slots = slots
+        self.slot_size = slot_size
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(name=name, create=self._owner, size=slots * slot_size)
+        self.name = self._shm.name
+        self._free = queue.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+
+    @classmethod
+    def attach(cls, name, slots, slot_size):
+        """在其他进程中打开已创建的缓冲区，参数为 handle 的返回值"""
+        return cls(slots, slot_size, name)
+
+    @property
+    def handle(self):
+        """:return: (共享内存名称, 槽位数量, 槽位大小)，可以传给子进程"""
+        return self.name, self.slots, self.slot_size
+
+    def fits(self, data):
+        return len(data) <= self.slot_size
+
+    def write(self, data, timeout=None):
+        """
+        写入一个空闲槽位，没有空闲槽位时等待
+        :param data: 图片字节
+        :param timeout: 等待空闲槽位的最长时间（秒），为 None 时一直等待
+        :return: 槽位编号，数据超过槽位大小或等待超时返回 None
+        """
+        if not self.fits(data):
+            return None
+        try:
+            slot = self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        offset = slot * self.slot_size
+        self._shm.buf[offset:offset + len(data)] = data
+        return slot
+
+    def read(self, slot, length):
+        """读取槽位中的数据（复制一份），读取后写入方即可复用该槽位"""
+        offset = slot * self.slot_size
+        return bytes(self._shm.buf[offset:offset + length])
+
+    def release(self, slot):
+        """接收方处理完毕后归还槽位"""
+        self._free.put(slot)
+
+    def close(self):
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
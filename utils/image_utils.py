@@ -1,4 +1,5 @@
 import cv2
+import struct
 import numpy as np
 from core.log import log
 
@@ -14,14 +15,180 @@ class ImageUtils:
         return template.shape[::-1]
 
     @staticmethod
-    def match_template(screenshot, template, threshold=None, mask=None):
+    def parse_raw_screencap(data):
+        """
+        解析 screencap（不带 -p）输出的原始帧缓冲，直接返回共享内存的数组视图，不复制像素数据。
+        :param data: screencap 输出的字节数据，头部为 宽、高、像素格式（新版系统还有色彩空间）。
+        :return: RGBA 格式的 (高, 宽, 4) 数组。
+        """
+        width, height, pixel_format = struct.unpack_from("<III", data, 0)
+        pixel_size = width * height * 4
+        header_size = len(data) - pixel_size
+        if header_size not in (12, 16):
+            raise ValueError(f"无法解析的帧缓冲数据：{width}x{height}，格式 {pixel_format}，共 {len(data)} 字节")
+        frame = np.frombuffer(data, dtype=np.uint8, count=pixel_size, offset=header_size).reshape(height, width, 4)
+        if pixel_format == 5:  # BGRA_8888，统一转换为 RGBA
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2RGBA)
+        return frame
+
+    @staticmethod
+    def encode_image(image, ext=".bmp"):
+        """
+        将数组编码为图片字节，默认使用不压缩的 BMP，编码开销几乎只有一次内存拷贝。
+        :param image: 灰度或 BGR 图像数组。
+        :param ext: 编码格式扩展名。
+        :return: 图片字节数据。
+        """
+        ok, encoded = cv2.imencode(ext, image)
+        if not ok:
+            raise ValueError(f"图片编码失败：{ext}")
+        return encoded.tobytes()
+
+    @staticmethod
+    def crop_roi(screenshot, roi, template_shape=None):
+        """
+        按搜索区域截取截图，返回的是原数组的视图，不复制数据。
+        :param screenshot: 截图。
+        :param roi: 搜索区域 (x, y, 宽, 高)，为 None 时返回整张截图。
+        :param template_shape: 模板图片的 shape，区域比模板还小时退回整张截图。
+        :return: 截取后的图像和区域左上角在原图中的偏移 (x, y)。
+        """
+        if roi is None:
+            return screenshot, (0, 0)
+        x, y, w, h = roi
+        height, width = screenshot.shape[:2]
+        x1, y1 = max(0, int(x)), max(0, int(y))
+        x2, y2 = min(width, int(x + w)), min(height, int(y + h))
+        if template_shape is not None and (x2 - x1 < template_shape[1] or y2 - y1 < template_shape[0]):
+            log.debug(f"搜索区域 {roi} 小于模板图片，改为搜索整张截图")
+            return screenshot, (0, 0)
+        return screenshot[y1:y2, x1:x2], (x1, y1)
+
+    @staticmethod
+    def to_gray(image):
+        """
+        将 BGR/BGRA 图像转为单通道灰度图，已是灰度图时原样返回。
+        :param image: 图像数组。
+        :return: 灰度图。
+        """
+        if image is None or image.ndim == 2:
+            return image
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        return cv2.cvtColor(image, code)
+
+    @staticmethod
+    def build_mosaic(image, row_ranges, col_ranges, gap=40, fill=255):
+        """
+        将图像中按行、列范围划分出的格子紧凑地拼成一张小图，格子之间保留空白间隔，
+        避免相邻格子的文字被识别成同一行。
+        :param image: 原图。
+        :param row_ranges: 格子所在的行范围列表 [(y1, y2), ...]，左闭右开。
+        :param col_ranges: 格子所在的列范围列表 [(x1, x2), ...]，左闭右开。
+        :param gap: 格子之间以及四周的空白间隔（像素）。
+        :param fill: 空白间隔的填充值。
+        :return: (拼图, 坐标映射)，坐标映射交给 map_mosaic_points 换算回原图坐标。
+        """
+        def layout(ranges):
+            starts, position = [], gap
+            for start, end in ranges:
+                starts.append(position)
+                position += end - start + gap
+            return np.array(starts), np.array([start for start, _ in ranges]), position
+
+        dst_x, src_x, width = layout(col_ranges)
+        dst_y, src_y, height = layout(row_ranges)
+        mosaic = np.full((height, width) + image.shape[2:], fill, dtype=image.dtype)
+        for (y1, y2), top in zip(row_ranges, dst_y):
+            for (x1, x2), left in zip(col_ranges, dst_x):
+                mosaic[top:top + y2 - y1, left:left + x2 - x1] = image[y1:y2, x1:x2]
+        return mosaic, ((dst_x, src_x), (dst_y, src_y))
+
+    @staticmethod
+    def map_mosaic_points(points, mosaic_map):
+        """
+        将拼图中的坐标换算回原图坐标，落在间隔里的点按其左侧（上方）的格子换算。
+        :param points: 坐标数组，最后一维为 (x, y)。
+        :param mosaic_map: build_mosaic 返回的坐标映射。
+        :return: 原图坐标数组，形状与输入相同。
+        """
+        points = np.asarray(points, dtype=np.int64)
+        mapped = np.empty_like(points)
+        for axis, (dst, src) in enumerate(mosaic_map):
+            index = np.clip(np.searchsorted(dst, points[..., axis], side='right') - 1, 0, len(dst) - 1)
+            mapped[..., axis] = points[..., axis] - dst[index] + src[index]
+        return mapped
+
+    @staticmethod
+    def pil_gray(image, lut=None):
+        """
+        RGB(A) 转灰度，结果与 PIL 的 convert('L') 完全一致（ITU-R 601-2，定点运算并四舍五入）。
+        :param image: (高, 宽, 3 或 4) 的 RGB(A) 数组。
+        :param lut: 转灰度前逐通道应用的查找表，与灰度权重合并成三张表，一次完成。
+        :return: (高, 宽) 的灰度数组。
+        """
+        values = np.arange(256, dtype=np.uint32) if lut is None else lut.astype(np.uint32)
+        red, green, blue = values * 19595 + 0x8000, values * 38470, values * 7471
+        return ((red[image[..., 0]] + green[image[..., 1]] + blue[image[..., 2]]) >> 16).astype(np.uint8)
+
+    @staticmethod
+    def enhance_lut(mean, contrast=2.0, brightness=3.0):
+        """
+        生成对比度、亮度增强的查找表，结果与依次调用 ImageEnhance.Contrast、ImageEnhance.Brightness 一致。
+        :param mean: 对比度增强使用的平均亮度（整数）。
+        :param contrast: 对比度增强倍数。
+        :param brightness: 亮度增强倍数。
+        :return: 长度 256 的查找表，逐通道使用。
+        """
+        def blend(base, values, factor):
+            # 与 PIL 的 Image.blend 相同：单精度浮点计算后截断到 0~255
+            values = np.float32(base) + np.float32(factor) * (values - np.float32(base))
+            return np.clip(values, 0, 255).astype(np.uint8).astype(np.float32)
+
+        values = np.arange(256, dtype=np.float32)
+        return blend(0, blend(mean, values, contrast), brightness).astype(np.uint8)
+
+    @staticmethod
+    def enhance_for_ocr(image, row_ranges, col_ranges, contrast=2.0, brightness=3.0, gap=None):
+        """
+        OCR 前的预处理：格子以外涂白，增强对比度、亮度并转为灰度图。
+        只计算格子区域，涂白部分的结果是常数，整个过程用一张查找表完成。
+        :param image: (高, 宽, 3 或 4) 的 RGB(A) 截图数组。
+        :param row_ranges: 格子所在的行范围列表 [(y1, y2), ...]，左闭右开。
+        :param col_ranges: 格子所在的列范围列表 [(x1, x2), ...]，左闭右开。
+        :param contrast: 对比度增强倍数。
+        :param brightness: 亮度增强倍数。
+        :param gap: 为 None 时返回与截图同尺寸的灰度图；否则按该间隔把格子拼成小图（见 build_mosaic）。
+        :return: (灰度图, 坐标映射)，不拼图时坐标映射为 None。
+        """
+        height, width = image.shape[:2]
+        cells = [(y1, y2, x1, x2) for y1, y2 in row_ranges for x1, x2 in col_ranges]
+
+        # 涂白区域的灰度为 255，据此得到整张涂白截图的平均亮度（与 ImageStat 一样四舍五入）
+        total = sum(int(ImageUtils.pil_gray(image[y1:y2, x1:x2]).sum(dtype=np.uint64)) for y1, y2, x1, x2 in cells)
+        blank = width * height - sum((y2 - y1) * (x2 - x1) for y1, y2, x1, x2 in cells)
+        mean = int((total + 255 * blank) / (width * height) + 0.5)
+        lut = ImageUtils.enhance_lut(mean, contrast, brightness)
+
+        # 白色 (v, v, v) 转灰度后仍为 v
+        gray = np.full((height, width), lut[255], dtype=np.uint8)
+        for y1, y2, x1, x2 in cells:
+            gray[y1:y2, x1:x2] = ImageUtils.pil_gray(image[y1:y2, x1:x2], lut)
+        if gap is None:
+            return gray, None
+        return ImageUtils.build_mosaic(gray, row_ranges, col_ranges, gap, fill=lut[255])
+
+    @staticmethod
+    def match_template(screenshot, template, threshold=None, mask=None, grayscale=False):
         """
         :param screenshot: 截图。
         :param template: 模板图片。
         :param threshold: 匹配阈值，小于此值的匹配将被忽略。
         :param mask: 模板的掩码，用于匹配透明区域。
+        :param grayscale: 是否在单通道灰度图上匹配，耗时约为三通道的 1/3。
         :return: 最大匹配值和最佳匹配位置。
         """
+        if grayscale:
+            screenshot, template = ImageUtils.to_gray(screenshot), ImageUtils.to_gray(template)
         if mask is not None:
             result = cv2.matchTemplate(screenshot, template, cv2.TM_SQDIFF, mask=mask)
             min_val, _, min_loc, _ = cv2.minMaxLoc(result)
@@ -36,10 +203,45 @@ class ImageUtils:
 
         return max_val, max_loc
 
+    @staticmethod
+    def resize_template(template, mask, scale):
+        """
+        按比例缩放模板图和掩码。
+        :param template: 模板图片。
+        :param mask: 模板的掩码，可为 None。
+        :param scale: 缩放比例。
+        :return: (缩放后的模板, 缩放后的掩码)。
+        """
+        if scale == 1.0:
+            return template, mask
+        scaled_template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        scaled_mask = None
+        if mask is not None:
+            scaled_mask = cv2.resize(mask, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return scaled_template, scaled_mask
+
+    @staticmethod
+    def get_scales(scale_range=(0.8, 1.1), scale_step=0.1, enable_scaling=True):
+        """
+        生成缩放比例列表，使用整数步数计算，避免浮点累加导致比例集合不确定。
+        :param scale_range: 缩放比例范围，元组形式 (min_scale, max_scale)。
+        :param scale_step: 缩放步长。
+        :param enable_scaling: 是否启用缩放功能，不启用时只使用原始比例（1.0）。
+        :return: 缩放比例列表。
+        """
+        if not enable_scaling:
+            return [1.0]
+        min_scale, max_scale = scale_range
+        steps = int(round((max_scale - min_scale) / scale_step))
+        return [round(min_scale + i * scale_step, 4) for i in range(steps + 1)]
+
     @staticmethod
     def scale_and_match_template(screenshot, template, threshold=None, mask=None, scale_range=(0.8, 1.1),
-                                 scale_step=0.1, enable_scaling=True):
+                                 scale_step=0.1, enable_scaling=True, pyramid=True, top_k=3, refine_margin=6,
+                                 variants=None, grayscale=False):
         """
+        多比例模板匹配。无掩码时使用图像金字塔由粗到精匹配：先在缩小一半的截图上匹配所有比例，
+        再只对得分最高的几个候选在原图的小窗口内精确匹配。
         :param screenshot: 截图。
         :param template: 模板图片。
         :param threshold: 匹配阈值，小于此值的匹配将被忽略。
@@ -47,29 +249,44 @@ class ImageUtils:
         :param scale_range: 缩放比例范围，元组形式 (min_scale, max_scale)。
         :param scale_step: 缩放步长。
         :param enable_scaling: 是否启用缩放功能。
-        :return: 最大匹配值、最佳匹配位置和最佳缩放比例。
+        :param pyramid: 是否启用金字塔匹配。
+        :param top_k: 进入精确匹配阶段的候选数量。
+        :param refine_margin: 精确匹配时候选位置周围的搜索余量（像素）。
+        :param variants: 预先缩放好的模板 {缩放比例: (模板, 掩码)}，缺少的比例会临时缩放。灰度模式下需传入灰度模板。
+        :param grayscale: 是否在单通道灰度图上匹配。
+        :return: 最大匹配值和最佳匹配位置。
         """
+        if grayscale:
+            screenshot, template = ImageUtils.to_gray(screenshot), ImageUtils.to_gray(template)
+        scales = ImageUtils.get_scales(scale_range, scale_step, enable_scaling)
+
+        # 模板缩小一半后太小时，粗匹配的结果不可靠，直接在原图上逐个比例匹配
+        min_side = min(template.shape[:2]) * min(scales) / 2
+        if mask is None and pyramid and min_side >= 12:
+            best_max_val, best_max_loc = ImageUtils._pyramid_match(screenshot, template, scales, top_k,
+                                                                  refine_margin, variants or {})
+        else:
+            best_max_val, best_max_loc = ImageUtils._sweep_match(screenshot, template, scales, mask,
+                                                                variants or {})
+
+        # 检查最大匹配值是否满足阈值要求
+        if threshold is not None and best_max_val < threshold:
+            return 0.0, (-1, -1)  # 返回默认值
+
+        return best_max_val, best_max_loc
+
+    @staticmethod
+    def _sweep_match(screenshot, template, scales, mask, variants):
+        """在原图上逐个比例做整图匹配，返回最大匹配值和最佳匹配位置"""
         best_max_val = 0.0
         best_max_loc = (-1, -1)
 
-        if enable_scaling:
-            min_scale, max_scale = scale_range
-            current_scale = min_scale
-        else:
-            # 如果不启用缩放，则只使用原始比例（1.0）
-            min_scale, max_scale = 1.0, 1.0
-            current_scale = 1.0
-
-        while current_scale <= max_scale:
-            # 缩放模板图
-            scaled_template = cv2.resize(template, None, fx=current_scale, fy=current_scale,
-                                         interpolation=cv2.INTER_AREA)
+        for scale in scales:
+            # 缩放模板图和掩码
+            scaled_template, scaled_mask = variants.get(scale) or ImageUtils.resize_template(template, mask, scale)
 
             try:
                 if mask is not None:
-                    # 缩放掩码
-                    scaled_mask = cv2.resize(mask, None, fx=current_scale, fy=current_scale,
-                                             interpolation=cv2.INTER_AREA)
                     result = cv2.matchTemplate(screenshot, scaled_template, cv2.TM_SQDIFF, mask=scaled_mask)
                     min_val, _, min_loc, _ = cv2.minMaxLoc(result)
                     current_max_val = 1 - min_val  # 对于 TM_SQDIFF，取反以统一比较
@@ -78,21 +295,53 @@ class ImageUtils:
                     result = cv2.matchTemplate(screenshot, scaled_template, cv2.TM_CCOEFF_NORMED)
                     _, current_max_val, _, current_max_loc = cv2.minMaxLoc(result)
 
-                # print(f"缩放比例: {current_scale}, 匹配值: {current_max_val}, 匹配位置: {current_max_loc}")
-
                 # 更新最佳匹配结果
                 if current_max_val > best_max_val:
                     best_max_val = current_max_val
                     best_max_loc = current_max_loc
 
             except cv2.error as e:
-                log.debug(f"模板匹配出错（缩放比例 {current_scale}）: {e}")
+                log.debug(f"模板匹配出错（缩放比例 {scale}）: {e}")
 
-            current_scale += scale_step
+        return best_max_val, best_max_loc
 
-        # 检查最大匹配值是否满足阈值要求
-        if threshold is not None and best_max_val < threshold:
-            return 0.0, (-1, -1)  # 返回默认值
+    @staticmethod
+    def _pyramid_match(screenshot, template, scales, top_k, refine_margin, variants):
+        """由粗到精的金字塔匹配，返回最大匹配值和最佳匹配位置"""
+        # 粗匹配：截图和模板都缩小一半，匹配耗时约为原图的 1/16
+        small_screenshot = cv2.pyrDown(screenshot)
+        candidates = []
+        for scale in scales:
+            half_scale = round(scale / 2, 4)
+            small_template, _ = variants.get(half_scale) or ImageUtils.resize_template(template, None, half_scale)
+            try:
+                result = cv2.matchTemplate(small_screenshot, small_template, cv2.TM_CCOEFF_NORMED)
+            except cv2.error as e:
+                log.debug(f"金字塔粗匹配出错（缩放比例 {scale}）: {e}")
+                continue
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            candidates.append((max_val, scale, max_loc))
+
+        # 精匹配：只在得分最高的候选位置附近的小窗口内用原尺寸模板匹配
+        best_max_val = 0.0
+        best_max_loc = (-1, -1)
+        height, width = screenshot.shape[:2]
+        for _, scale, (x, y) in sorted(candidates, reverse=True)[:top_k]:
+            scaled_template, _ = variants.get(scale) or ImageUtils.resize_template(template, None, scale)
+            template_height, template_width = scaled_template.shape[:2]
+            x1 = max(0, x * 2 - refine_margin)
+            y1 = max(0, y * 2 - refine_margin)
+            x2 = min(width, x * 2 + template_width + refine_margin)
+            y2 = min(height, y * 2 + template_height + refine_margin)
+            try:
+                result = cv2.matchTemplate(screenshot[y1:y2, x1:x2], scaled_template, cv2.TM_CCOEFF_NORMED)
+            except cv2.error as e:
+                log.debug(f"金字塔精匹配出错（缩放比例 {scale}）: {e}")
+                continue
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val > best_max_val:
+                best_max_val = max_val
+                best_max_loc = (max_loc[0] + x1, max_loc[1] + y1)
 
         return best_max_val, best_max_loc
 
@@ -109,9 +358,7 @@ class ImageUtils:
         if scale is not None:
             template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-        locations = np.where(result >= threshold)
-        matches = ImageUtils.filter_overlapping_matches(locations, template.shape[::-1])
-        return ImageUtils.convert_np_int64_to_int(matches)
+        return ImageUtils.non_max_suppression(result, threshold, (template.shape[1], template.shape[0]))
 
     @staticmethod
     def read_template_with_mask(target):
@@ -196,22 +443,64 @@ class ImageUtils:
         return matches
 
     @staticmethod
-    def count_template_matches(target, template, threshold):
+    def non_max_suppression(result, threshold, template_size, max_candidates=1024):
+        """对模板匹配结果做非极大值抑制，找出所有不重叠的匹配。
+
+        超过阈值的点较多时，先用膨胀运算提取模板大小邻域内的局部极大值，只保留少量候选点；
+        再按匹配值从高到低依次接受与已接受匹配都不重叠的候选，重叠判断用 NumPy 向量化完成。
+
+        参数:
+        - result: cv2.matchTemplate 的结果矩阵（匹配值越大越相似）。
+        - threshold: 匹配阈值。
+        - template_size: 模板图片的大小 (宽度, 高度)。
+        - max_candidates: 超过阈值的点多于此数量时才先提取局部极大值。
+
+        返回:
+        - matches: 不重叠的匹配位置列表 [(x, y), ...]，按匹配值从高到低排序。
+        """
+        width, height = template_size
+        candidates = result >= threshold
+        ys, xs = np.nonzero(candidates)
+        if len(xs) > max_candidates:
+            kernel = np.ones((max(1, height), max(1, width)), np.uint8)
+            ys, xs = np.nonzero(candidates & (result >= cv2.dilate(result, kernel)))
+        if len(xs) == 0:
+            return []
+
+        # 按匹配值从高到低排序，匹配值相同时保持从上到下、从左到右的顺序
+        order = np.argsort(-result[ys, xs], kind='stable')
+        xs, ys = xs[order], ys[order]
+
+        kept_x = np.empty(len(xs), dtype=np.int64)
+        kept_y = np.empty(len(ys), dtype=np.int64)
+        count = 0
+        for x, y in zip(xs, ys):
+            # 与 intersected 的判断一致：两个同样大小的矩形在横纵方向的距离都不超过宽高时相交
+            if count and np.any((np.abs(kept_x[:count] - x) <= width) & (np.abs(kept_y[:count] - y) <= height)):
+                continue
+            kept_x[count] = x
+            kept_y[count] = y
+            count += 1
+        return [(int(x), int(y)) for x, y in zip(kept_x[:count], kept_y[:count])]
+
+    @staticmethod
+    def count_template_matches(target, template, threshold, grayscale=False):
         """使用模板匹配计算目标图片中的匹配数。
 
         参数:
         - target: 目标图片数组。
         - template: 模板图片数组。
         - threshold: 匹配阈值，用于决定哪些结果被认为是匹配。
+        - grayscale: 是否在单通道灰度图上匹配。
 
         返回:
         - match_count: 匹配的数量。
         """
+        if grayscale:
+            target, template = ImageUtils.to_gray(target), ImageUtils.to_gray(template)
         # 执行模板匹配
         result = cv2.matchTemplate(target, template, cv2.TM_CCOEFF_NORMED)
-        locations = np.where(result >= threshold)
-
-        matches = ImageUtils.filter_overlapping_matches(locations, template.shape[::-1])
+        matches = ImageUtils.non_max_suppression(result, threshold, (template.shape[1], template.shape[0]))
 
         # 返回匹配数量
         return len(matches)
@@ -231,3 +520,46 @@ class ImageUtils:
         center_x = max_loc[0] + width // 2
         center_y = max_loc[1] + height // 2
         return center_x, center_y
+
+
+if __name__ == "__main__":
+    # OCR 预处理的微基准：原先的 PIL 流程与查找表流程的单帧耗时，并校验两者输出一致
+    # 用法：python -m utils.image_utils [截图路径]
+    import sys
+    import time
+    from PIL import Image, ImageDraw, ImageEnhance
+    from utils.ocr_profile import OcrProfile
+
+    profile = OcrProfile.load()
+    if len(sys.argv) > 1:
+        frame = cv2.cvtColor(cv2.imread(sys.argv[1], cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGBA)
+    else:
+        frame = np.random.default_rng(0).integers(0, 256, (1080, 1920, 4), dtype=np.uint8)
+        frame[..., 3] = 255
+
+    def pil_pipeline():
+        image = Image.frombuffer("RGBA", (frame.shape[1], frame.shape[0]), frame, "raw", "RGBA", 0, 1).copy()
+        width, height = image.size
+        draw = ImageDraw.Draw(image)
+        for (_, bottom), (top, _) in zip(((0, 0),) + profile.rows, profile.rows + ((height + 1, 0),)):
+            draw.rectangle([(0, bottom), (width, top - 1)], fill="white")
+        for (_, right), (left, _) in zip(((0, 0),) + profile.cols, profile.cols + ((width + 1, 0),)):
+            draw.rectangle([(right, 0), (left - 1, height)], fill="white")
+        image = ImageEnhance.Contrast(image).enhance(profile.contrast)
+        image = ImageEnhance.Brightness(image).enhance(profile.brightness)
+        return np.asarray(image.convert('L'))
+
+    def lut_pipeline():
+        return ImageUtils.enhance_for_ocr(frame, profile.rows, profile.cols, profile.contrast, profile.brightness)[0]
+
+    def lut_mosaic():
+        return ImageUtils.enhance_for_ocr(frame, profile.rows, profile.cols, profile.contrast, profile.brightness,
+                                          gap=profile.mosaic_gap)[0]
+
+    print(f"输出一致：{np.array_equal(pil_pipeline(), lut_pipeline())}")
+    for name, func in (("PIL 涂白+增强", pil_pipeline), ("查找表 整图", lut_pipeline), ("查找表 拼图", lut_mosaic)):
+        rounds = 20
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        print(f"{name}: {(time.perf_counter() - start) * 1000 / rounds:.2f} ms/帧")
@@ -1,4 +1,9 @@
-from collections import defaultdict
+import numpy as np
+from collections import namedtuple
+from core.ocr.ocr_result import OcrResult
+
+# 页面的文本排列，见 OcrAnalysis.get_page_layout
+PageLayout = namedtuple('PageLayout', ['left_texts', 'all_texts', 'signature'])
 
 
 class OcrAnalysis:
@@ -7,7 +12,7 @@ class OcrAnalysis:
     def find_trading_location(ocr_results, text, x_offset=0, y_offset=0):
         """
         从OCR结果中找到指定识别文本的中心点位置
-        :param ocr_results: OCR识别结果，格式为 {'code': 100, 'data': [{'box': [[x1, y1], [x2, y2], ...], 'text': '...', ...}, ...]}
+        :param ocr_results: OCR识别结果，OcrResult 或 {'code': 100, 'data': [{'box': [[x1, y1], [x2, y2], ...], 'text': '...', ...}, ...]}
         :param text: 需要查找的文本，如 "小麦"
         :param x_offset: X 坐标偏移量（默认 0）
         :param y_offset: Y 坐标偏移量（默认 0）
@@ -15,17 +20,16 @@ class OcrAnalysis:
         """
         centers = []  # 用于存储找到的中心点坐标
 
-        if ocr_results.get('code') != 100:
+        ocr_results = OcrResult.from_dict(ocr_results)
+        if ocr_results.code != 100:
             print(f"OCR结果无效: {ocr_results}")
             return centers
 
-        for result in ocr_results['data']:
-            if result['text'] == text:
-                box = result['box']
-                x_coords = [point[0] for point in box]
-                y_coords = [point[1] for point in box]
-                center_x = sum(x_coords) / len(box) + x_offset
-                center_y = sum(y_coords) / len(box) + y_offset
+        for index, result_text in enumerate(ocr_results.texts):
+            if result_text == text:
+                center_x, center_y = ocr_results.centers[index].tolist()
+                center_x += x_offset
+                center_y += y_offset
                 print(f"找到文本 '{text}' 的中心点: ({center_x}, {center_y})")
                 centers.append((center_x, center_y))
         return centers
@@ -36,57 +40,47 @@ class OcrAnalysis:
         根据 OCR 识别结果，获取文本值并按固定顺序排列。
 
         参数:
-            ocr_res: OCR识别结果
+            ocr_res: OCR识别结果（OcrResult 或引擎返回的字典）
             left_only: 布尔值，True表示只获取左侧文本，False表示获取所有文本
         """
-        # 定义屏幕的中心 x 坐标
-        center_x = 1920 / 2
-
-        # 初始化结果列表
-        filtered_texts = []
-
-        # 遍历 OCR 识别结果，根据 box 坐标判断文本位置
-        for result in ocr_res['data']:
-            # 过滤掉置信度（score）低于 0.7 的识别结果
-            if 'score' in result and result['score'] < 0.7:
-                continue
-
-            # 获取 box 的 x 和 y 坐标
-            box = result['box']
-            x_coords = [point[0] for point in box]
-            y_coords = [point[1] for point in box]
+        layout = OcrAnalysis.get_page_layout(ocr_res)
+        return layout.left_texts if left_only else layout.all_texts
 
-            # 根据 left_only 参数决定是否过滤右侧文本
-            if left_only and not all(x < center_x for x in x_coords):
-                continue
+    @staticmethod
+    def get_page_layout(ocr_res, y_threshold=20, min_score=0.7):
+        """
+        一次排序得到页面的文本排列：按行从上到下、行内从左到右。
+        文本按最上方坐标排序后顺序扫描，与当前行第一个文本的 y 坐标相差不超过 y_threshold 的归为同一行，
+        结果与识别结果的顺序无关。
 
-            # 提取最小的 y 和 x 坐标（文本区域的最上方和最左侧）
-            y_coord = min(y_coords)
-            x_coord = min(x_coords)
-            filtered_texts.append({
-                'text': result['text'],
-                'y': y_coord,
-                'x': x_coord
-            })
+        参数:
+            ocr_res: OCR识别结果（OcrResult 或引擎返回的字典）
+            y_threshold: 同一行允许的 y 坐标差
+            min_score: 置信度低于该值的识别结果被忽略
+        返回:
+            PageLayout(left_texts=左侧文本, all_texts=全部文本, signature=左侧文本组成的页面签名，可作为字典键比较)
+        """
+        # 定义屏幕的中心 x 坐标
+        center_x = 1920 / 2
 
-        # 按 y 坐标分组（将相近的 y 坐标视为同一行）
-        y_threshold = 20  # 定义 y 坐标的阈值
-        grouped_texts = defaultdict(list)
-        for item in filtered_texts:
-            # 找到最接近的 y 坐标组
-            matched_y = None
-            for y in grouped_texts.keys():
-                if abs(y - item['y']) <= y_threshold:
-                    matched_y = y
-                    break
-            if matched_y is None:
-                matched_y = item['y']
-            grouped_texts[matched_y].append(item)
+        ocr_res = OcrResult.from_dict(ocr_res)
+        indices = (ocr_res.scores >= min_score).nonzero()[0]
+        # 文本区域的最上方和最左侧坐标；整个文本框都在中心线左侧的属于左页
+        lefts, tops = ocr_res.mins[indices, 0], ocr_res.mins[indices, 1]
+        left_side = (ocr_res.maxs[indices, 0] < center_x).tolist()
 
-        # 按 y 坐标从小到大排序，然后对每行内的文本按 x 坐标排序
-        sorted_texts = []
-        for y in sorted(grouped_texts.keys()):
-            row_texts = sorted(grouped_texts[y], key=lambda item: item['x'])
-            sorted_texts.extend([item['text'] for item in row_texts])
+        # 按 y 坐标排序后扫描一遍，同时给全部文本和左页文本分行（左页只在左页文本之间分行）
+        rows = np.zeros((2, len(indices)), dtype=np.int64)
+        row, anchor = [-1, -1], [None, None]
+        top_values = tops.tolist()
+        for position in np.argsort(tops, kind='stable').tolist():
+            for layout in (0, 1) if left_side[position] else (0,):
+                if anchor[layout] is None or top_values[position] - anchor[layout] > y_threshold:
+                    row[layout], anchor[layout] = row[layout] + 1, top_values[position]
+                rows[layout, position] = row[layout]
 
-        return sorted_texts
+        # 先按行、再按行内 x 坐标排序
+        texts = [ocr_res.texts[index] for index in indices.tolist()]
+        all_texts = [texts[position] for position in np.lexsort((lefts, rows[0])).tolist()]
+        left_texts = [texts[position] for position in np.lexsort((lefts, rows[1])).tolist() if left_side[position]]
+        return PageLayout(left_texts, all_texts, tuple(left_texts))
@@ -0,0 +1,52 @@
+import json
+from core.log import log
+
+
+class OcrProfile:
+    """
+    OCR 预处理参数，存放在 res/ocr_profile.json 中，格式为：
+    {
+        "newspaper": {
+            "rows": [[y1, y2], ...],     格子所在的行范围（截图像素坐标，左闭右开），其余区域涂白
+            "cols": [[x1, x2], ...],     格子所在的列范围
+            "contrast": 2.0,             对比度增强倍数
+            "brightness": 3.0,           亮度增强倍数
+            "mosaic_gap": 40             拼图时格子之间的空白间隔（像素）
+        }
+    }
+    """
+
+    DEFAULT_PATH = "./res/ocr_profile.json"
+    DEFAULTS = {
+        "rows": [[101, 145], [421, 460], [731, 780]],
+        "cols": [[301, 530], [651, 900], [1071, 1280], [1421, 1600]],
+        "contrast": 2.0,
+        "brightness": 3.0,
+        "mosaic_gap": 40,
+    }
+
+    def __init__(self, rows, cols, contrast, brightness, mosaic_gap):
+        self.rows = tuple(tuple(r) for r in rows)
+        self.cols = tuple(tuple(c) for c in cols)
+        self.contrast = float(contrast)
+        self.brightness = float(brightness)
+        self.mosaic_gap = int(mosaic_gap)
+
+    @classmethod
+    def load(cls, path=None, name="newspaper"):
+        """
+        读取预处理参数，文件或字段缺失时使用默认值
+        :param path: 配置文件路径，为 None 时使用 ./res/ocr_profile.json
+        :param name: 配置名称
+        :return: OcrProfile
+        """
+        path = path or cls.DEFAULT_PATH
+        values = dict(cls.DEFAULTS)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                values.update(json.load(f).get(name, {}))
+        except FileNotFoundError:
+            log.debug(f"未找到 OCR 预处理配置 {path}，使用默认参数")
+        except (OSError, ValueError) as e:
+            log.warning(f"读取 OCR 预处理配置失败：{path}，{e}")
+        return cls(values["rows"], values["cols"], values["contrast"], values["brightness"], values["mosaic_gap"])
@@ -0,0 +1,91 @@
+import time
+import cv2
+import numpy as np
+
+
+class PageChangeDetector:
+    """
+    报纸翻页/刷新检测：把页面的格子区域缩成很小的灰度缩略图，与已记录的各页缩略图逐格比较，
+    判断当前画面是已知的第几页，还是一张新的（或已刷新的）页面，不需要 OCR。
+    """
+
+    def __init__(self, row_ranges, col_ranges, cell_size=(48, 12), threshold=2.0):
+        """
+        :param row_ranges: 格子所在的行范围列表 [(y1, y2), ...]，左闭右开
+        :param col_ranges: 格子所在的列范围列表 [(x1, x2), ...]，左闭右开
+        :param cell_size: 每个格子缩小后的尺寸 (宽, 高)
+        :param threshold: 任意一个格子的平均灰度差超过该值时认为不是同一页
+        """
+        self.row_ranges = tuple(row_ranges)
+        self.col_ranges = tuple(col_ranges)
+        self.cell_size = cell_size
+        self.threshold = threshold
+        self._pages = []
+        self._thumbnails = None  # 已记录页面的缩略图，形状为 (页数, 格子数, 高, 宽)
+        self._checks = 0
+        self._check_time = 0.0
+
+    def thumbnail(self, gray):
+        """
+        生成页面缩略图
+        :param gray: 灰度截图
+        :return: (格子数, 高, 宽) 的 int16 数组
+        """
+        # 各格子大小不同，逐格缩放，每个缩略格子都只包含对应格子的内容；按行优先排列
+        cells = [
+            cv2.resize(gray[y1:y2, x1:x2], self.cell_size, interpolation=cv2.INTER_AREA)
+            for y1, y2 in self.row_ranges
+            for x1, x2 in self.col_ranges
+        ]
+        return np.stack(cells).astype(np.int16)
+
+    def match(self, thumbnail):
+        """
+        判断缩略图属于已记录的哪一页
+        :param thumbnail: thumbnail() 的返回值
+        :return: 页码，不属于任何已记录页面时返回 None
+        """
+        if self._thumbnails is None:
+            return None
+
+        start = time.perf_counter()
+        # 每页取差异最大的格子，只有所有格子都足够接近才算同一页
+        diffs = np.abs(self._thumbnails - thumbnail).mean(axis=(2, 3)).max(axis=1)
+        best = int(diffs.argmin())
+        self._checks += 1
+        self._check_time += time.perf_counter() - start
+        return self._pages[best] if diffs[best] <= self.threshold else None
+
+    def remember(self, page, thumbnail):
+        """
+        记录一页的缩略图，同一页码重复记录时覆盖
+        :param page: 页码
+        :param thumbnail: thumbnail() 的返回值
+        """
+        if page in self._pages:
+            self._thumbnails[self._pages.index(page)] = thumbnail
+        elif self._thumbnails is None:
+            self._pages.append(page)
+            self._thumbnails = thumbnail[np.newaxis].copy()
+        else:
+            self._pages.append(page)
+            self._thumbnails = np.concatenate((self._thumbnails, thumbnail[np.newaxis]))
+
+    def reset(self):
+        """清空已记录的页面（报纸刷新后调用）"""
+        self._pages = []
+        self._thumbnails = None
+
+    @property
+    def pages(self):
+        return list(self._pages)
+
+    def stats(self):
+        """
+        :return: {"pages": 已记录页数, "checks": 比较次数, "avg_ms": 平均比较耗时（毫秒）}
+        """
+        return {
+            "pages": len(self._pages),
+            "checks": self._checks,
+            "avg_ms": round(self._check_time * 1000 / self._checks, 4) if self._checks else 0.0,
+        }
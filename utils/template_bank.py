@@ -0,0 +1,173 @@
+import os
+import cv2
+import tempfile
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from core.log import log
+from utils.image_utils import ImageUtils
+
+
+class Template:
+    """单张模板图片及其预计算数据（灰度图、掩码、各缩放比例下的模板与掩码）"""
+
+    def __init__(self, path, image, mask, variants):
+        """
+        :param path: 模板图片路径
+        :param image: BGR 模板图
+        :param mask: 透明通道掩码，没有透明区域时为 None
+        :param variants: {缩放比例: (缩放后的模板, 缩放后的掩码)}
+        """
+        self.path = path
+        self.image = image
+        self.mask = mask
+        self.gray = np.ascontiguousarray(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+        self.variants = variants
+        self.gray_variants = {
+            scale: (np.ascontiguousarray(cv2.cvtColor(scaled, cv2.COLOR_BGR2GRAY)), scaled_mask)
+            for scale, (scaled, scaled_mask) in variants.items()
+        }
+
+    @property
+    def shape(self):
+        return self.image.shape
+
+
+class TemplateBank:
+    """
+    模板图片库：启动时并行加载目录下的所有模板图片，预先计算灰度图、掩码和各缩放比例下的模板，
+    匹配时直接取用，不再重复读图和缩放。预计算结果按文件修改时间缓存为 .npz，重启后无需重新解码 PNG。
+    """
+
+    CACHE_DIR = ".cache"
+
+    def __init__(self, directory="./res/image", scale_range=(0.8, 1.1), scale_step=0.1, use_disk_cache=True):
+        """
+        :param directory: 模板图片目录
+        :param scale_range: 预计算的缩放比例范围
+        :param scale_step: 缩放步长
+        :param use_disk_cache: 是否使用 .npz 磁盘缓存
+        """
+        self.directory = directory
+        self.use_disk_cache = use_disk_cache
+        scales = ImageUtils.get_scales(scale_range, scale_step)
+        # 金字塔匹配还需要缩小一半的模板
+        self.scales = sorted(set(scales) | {round(scale / 2, 4) for scale in scales})
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def load_all(self, max_workers=None):
+        """
+        并行加载目录下的所有模板图片
+        :param max_workers: 线程数
+        :return: 成功加载的模板数量
+        """
+        paths = [os.path.join(self.directory, name) for name in sorted(os.listdir(self.directory))
+                 if name.lower().endswith('.png')]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = [template for template in executor.map(self._load_safely, paths) if template is not None]
+        log.debug(f"模板图片库加载完成，共 {len(loaded)} 张")
+        return len(loaded)
+
+    def get(self, path):
+        """
+        获取模板，未加载过的图片会在首次使用时加载
+        :param path: 模板图片路径
+        :return: Template
+        """
+        key = os.path.abspath(path)
+        template = self._templates.get(key)
+        if template is None:
+            template = self._load(path)
+        return template
+
+    def _load_safely(self, path):
+        try:
+            return self._load(path)
+        except Exception as e:
+            log.warning(f"加载模板图片失败：{path}，{e}")
+            return None
+
+    def _load(self, path):
+        key = os.path.abspath(path)
+        template = self._load_cache(path) if self.use_disk_cache else None
+        if template is None:
+            template = self._build(path)
+            if self.use_disk_cache:
+                self._save_cache(template)
+        with self._lock:
+            return self._templates.setdefault(key, template)
+
+    def _build(self, path):
+        """读取图片并预计算各缩放比例下的模板和掩码"""
+        raw = cv2.imread(path, cv2.IMREAD_UNCHANGED)  # 保留图片的透明通道
+        if raw is None:
+            raise ValueError(f"读取图片失败：{path}")
+        mask = None
+        if raw.ndim == 3 and raw.shape[-1] == 4:
+            alpha_channel = raw[:, :, 3]
+            if np.any(alpha_channel < 255):  # 检查是否存在非完全透明的像素
+                mask = np.ascontiguousarray(alpha_channel)
+            image = cv2.cvtColor(raw, cv2.COLOR_BGRA2BGR)
+        elif raw.ndim == 2:
+            image = cv2.cvtColor(raw, cv2.COLOR_GRAY2BGR)
+        else:
+            image = raw
+        image = np.ascontiguousarray(image)
+
+        variants = {}
+        for scale in self.scales:
+            variants[scale] = ImageUtils.resize_template(image, mask, scale)
+        return Template(path, image, mask, variants)
+
+    def _cache_path(self, path):
+        directory, name = os.path.split(path)
+        return os.path.join(directory, self.CACHE_DIR, f"{name}.npz")
+
+    def _load_cache(self, path):
+        cache_path = self._cache_path(path)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with np.load(cache_path) as data:
+                if (float(data['mtime']) != os.path.getmtime(path)
+                        or not np.array_equal(data['scales'], np.array(self.scales))):
+                    return None
+                mask = data['mask'] if 'mask' in data else None
+                variants = {}
+                for index, scale in enumerate(self.scales):
+                    scaled_mask = data[f'mask_{index}'] if f'mask_{index}' in data else None
+                    variants[scale] = (data[f'image_{index}'], scaled_mask)
+                return Template(path, data['image'], mask, variants)
+        except Exception as e:
+            log.debug(f"读取模板缓存失败：{cache_path}，{e}")
+            return None
+
+    def _save_cache(self, template):
+        cache_path = self._cache_path(template.path)
+        arrays = {
+            'mtime': np.array(os.path.getmtime(template.path)),
+            'scales': np.array(self.scales),
+            'image': template.image,
+        }
+        if template.mask is not None:
+            arrays['mask'] = template.mask
+        for index, scale in enumerate(self.scales):
+            scaled, scaled_mask = template.variants[scale]
+            arrays[f'image_{index}'] = scaled
+            if scaled_mask is not None:
+                arrays[f'mask_{index}'] = scaled_mask
+        # 先写入同目录下的临时文件再原子替换，多个进程同时构建缓存时读取方不会读到写了一半的文件
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(cache_path))
+            with os.fdopen(fd, "wb") as file:
+                np.savez(file, **arrays)
+            os.replace(temp_path, cache_path)
+            temp_path = None
+        except OSError as e:
+            log.debug(f"写入模板缓存失败：{cache_path}，{e}")
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
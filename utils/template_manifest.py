@@ -0,0 +1,76 @@
+import os
+import json
+import threading
+from core.log import log
+
+
+class TemplateManifest:
+    """
+    模板图片的附加配置，存放在图片同目录下的 manifest.json 中，格式为：
+    {
+        "templates": {
+            "return.png": {"roi": [x, y, 宽, 高], "color_mode": "gray"},
+            ...
+        }
+    }
+    roi 为该模板可能出现的屏幕区域（截图像素坐标），为 null 或缺省时搜索整张截图。
+    目前 res/image 下的模板都还没有配置 roi，需要在 1920x1080 的截图上量出位置固定的模板
+    （如 return.png、more1.png、more2.png）所在区域后再添加，区域应留出足够余量。
+    color_mode 为匹配时使用的颜色模式，gray（默认）在灰度图上匹配，color 在 BGR 彩色图上匹配。
+    """
+
+    MANIFEST_NAME = "manifest.json"
+    _cache = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls, directory):
+        """
+        读取（并缓存）某个目录下的模板配置
+        :param directory: 模板图片所在目录
+        :return: {文件名: 配置字典}，目录下没有配置文件时返回空字典
+        """
+        directory = os.path.abspath(directory)
+        with cls._lock:
+            if directory in cls._cache:
+                return cls._cache[directory]
+
+            templates = {}
+            manifest_path = os.path.join(directory, cls.MANIFEST_NAME)
+            if os.path.exists(manifest_path):
+                try:
+                    with open(manifest_path, 'r', encoding='utf-8') as f:
+                        templates = json.load(f).get('templates', {})
+                except (OSError, ValueError) as e:
+                    log.warning(f"读取模板配置失败：{manifest_path}，{e}")
+            cls._cache[directory] = templates
+            return templates
+
+    @classmethod
+    def lookup(cls, target):
+        """
+        获取某张模板图片的配置
+        :param target: 模板图片路径
+        :return: 配置字典，没有配置时返回空字典
+        """
+        directory, name = os.path.split(target)
+        return cls.load(directory or '.').get(name, {})
+
+    @classmethod
+    def roi(cls, target):
+        """
+        获取模板图片的搜索区域
+        :param target: 模板图片路径
+        :return: (x, y, 宽, 高)，未配置时返回 None
+        """
+        roi = cls.lookup(target).get('roi')
+        return tuple(roi) if roi else None
+
+    @classmethod
+    def is_grayscale(cls, target):
+        """
+        判断模板图片是否在灰度图上匹配
+        :param target: 模板图片路径
+        :return: 未配置 color_mode 或配置为 gray 时返回 True
+        """
+        return cls.lookup(target).get('color_mode', 'gray') != 'color'
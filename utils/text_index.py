@@ -0,0 +1,119 @@
+import unicodedata
+from collections import defaultdict, namedtuple
+from core.log import log
+from core.ocr.ocr_result import OcrResult
+
+# 一个商品名称的匹配结果：识别出的原文本、中心点坐标、匹配置信度（0~1，1 为完全一致）
+TextMatch = namedtuple('TextMatch', ['text', 'center', 'confidence'])
+
+
+class TextIndex:
+    """
+    OCR 识别结果的文本索引：每个识别结果只建一次，按规范化后的文本归类识别框。
+    一次查询可以同时匹配多个商品名称，支持形近字纠正和编辑距离模糊匹配。
+    """
+
+    # OCR 常见的形近字误识别（识别结果 -> 正确字），规范化时逐字替换
+    CONFUSABLES = {
+        '夌': '麦',
+        '麥': '麦',
+        '蘿': '萝',
+        '蔔': '卜',
+        'ト': '卜',
+        '膠': '胶',
+        '帯': '带',
+        '帶': '带',
+    }
+
+    def __init__(self, ocr_res, confusables=None):
+        """
+        :param ocr_res: OCR识别结果（OcrResult 或引擎返回的字典）
+        :param confusables: 形近字表，为 None 时使用 CONFUSABLES
+        """
+        self.ocr_res = OcrResult.from_dict(ocr_res)
+        self.confusables = self.CONFUSABLES if confusables is None else confusables
+        self._entries = defaultdict(list)  # 规范化文本 -> 识别结果下标列表
+        for index, text in enumerate(self.ocr_res.texts):
+            self._entries[self.normalize(text, self.confusables)].append(index)
+
+    @staticmethod
+    def normalize(text, confusables=None):
+        """
+        文本规范化：全角转半角（NFKC）、去掉空白和标点、替换形近字
+        :param text: 文本
+        :param confusables: 形近字表
+        :return: 规范化后的文本
+        """
+        text = unicodedata.normalize('NFKC', text)
+        chars = (char for char in text if unicodedata.category(char)[0] not in 'ZPC')
+        if confusables:
+            chars = (confusables.get(char, char) for char in chars)
+        return ''.join(chars)
+
+    @staticmethod
+    def similarity(a, b):
+        """
+        按编辑距离计算的相似度：1 - 编辑距离 / 较长文本的长度
+        :return: 0~1，1 表示完全相同
+        """
+        if a == b:
+            return 1.0
+        if not a or not b:
+            return 0.0
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i]
+            for j, char_b in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+            previous = current
+        return 1 - previous[-1] / max(len(a), len(b))
+
+    def match(self, labels, min_confidence=0.66):
+        """
+        一次匹配多个商品名称。每条识别文本只归给与它最相似的一个名称，
+        完全一致（规范化后）的直接命中，其余按相似度模糊匹配。
+        :param labels: 商品名称列表，如 menu_config.json 中的全部商品
+        :param min_confidence: 模糊匹配的最低相似度，默认值下两个字的名称必须完全一致，三个字以上允许错一个字
+        :return: {商品名称: [TextMatch, ...]}
+        """
+        results = {label: [] for label in labels}
+        normalized = defaultdict(list)
+        for label in labels:
+            normalized[self.normalize(label, self.confusables)].append(label)
+
+        centers = self.ocr_res.centers.tolist()
+        for text, indices in self._entries.items():
+            if text in normalized:
+                label, confidence = normalized[text][0], 1.0
+            else:
+                label, confidence, ambiguous = None, 0.0, False
+                for candidate, candidate_labels in normalized.items():
+                    # 长度相差太多时相似度不可能达到阈值
+                    if abs(len(candidate) - len(text)) > (1 - min_confidence) * max(len(candidate), len(text)):
+                        continue
+                    score = self.similarity(text, candidate)
+                    if score > confidence:
+                        label, confidence, ambiguous = candidate_labels[0], score, False
+                    elif score == confidence:
+                        ambiguous = True
+                # 与两个名称同样相似时无法确定是哪一个，放弃
+                if label is None or confidence < min_confidence or ambiguous:
+                    continue
+                log.debug(f"模糊匹配：'{self.ocr_res.texts[indices[0]]}' -> '{label}'，置信度 {confidence:.2f}")
+
+            for index in indices:
+                results[label].append(TextMatch(self.ocr_res.texts[index], tuple(centers[index]), confidence))
+        return results
+
+    def find(self, label, labels=None, min_confidence=0.66):
+        """
+        查找一个商品名称的位置
+        :param label: 商品名称
+        :param labels: 参与竞争的全部商品名称，识别文本只归给其中最相似的一个，为 None 时只比较 label 本身
+        :param min_confidence: 模糊匹配的最低相似度
+        :return: 中心点坐标列表 [(center_x, center_y), ...]
+        """
+        labels = list(labels or ())
+        if label not in labels:
+            labels.append(label)
+        return [match.center for match in self.match(labels, min_confidence)[label]]